@@ -1,18 +1,51 @@
+import os
+
+import click
 from flask import Flask
 from flask_cors import CORS
-from app.extensions import db, jwt, bcrypt, migrate
-from app.config import Config
+from app.extensions import (db, jwt, bcrypt, cart_store, coupon_cache,
+                            wishlist_cache, facet_cache, review_stats, password_hasher, token_blocklist, replica_router,
+                            pool_metrics, compressor)
+from app.config import get_config
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def init_migrations(app):
+    """Register Flask-Migrate on ``app``.
+
+    Alembic is only imported here, so web workers, which never run
+    migrations, don't pay for it at start-up.
+    """
+    if "migrate" in app.extensions:
+        return
+    from flask_migrate import Migrate
+    Migrate(app, db, directory=MIGRATIONS_DIR)
 
 
-def create_app(config_class=Config):
+def create_app(config_class=None):
+    """Build the app from a config class or profile name (default: ``APP_ENV``)."""
+    if config_class is None or isinstance(config_class, str):
+        config_class = get_config(config_class)
     app = Flask(__name__)
     app.config.from_object(config_class)
 
     # Initialize extensions
     db.init_app(app)
+    replica_router.init_app(app)
+    pool_metrics.init_app(app)
     jwt.init_app(app)
+    from app.utils.security import init_jwt
+    init_jwt(jwt)
+    token_blocklist.init_app(app)
     bcrypt.init_app(app)
-    migrate.init_app(app, db)
+    password_hasher.init_app(app)
+    cart_store.init_app(app)
+    coupon_cache.init_app(app)
+    wishlist_cache.init_app(app)
+    facet_cache.init_app(app)
+    review_stats.init_app(app)
+    compressor.init_app(app)
     CORS(app, supports_credentials=True)
 
     # Register blueprints
@@ -25,6 +58,7 @@ def create_app(config_class=Config):
     from app.routes.wishlist_routes import wishlist_bp
     from app.routes.address_routes import address_bp
     from app.routes.coupon_routes import coupon_bp
+    from app.routes.health_routes import health_bp
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(product_bp, url_prefix="/api/products")
@@ -35,11 +69,14 @@ def create_app(config_class=Config):
     app.register_blueprint(wishlist_bp, url_prefix="/api/wishlist")
     app.register_blueprint(address_bp, url_prefix="/api/addresses")
     app.register_blueprint(coupon_bp, url_prefix="/api/coupons")
+    app.register_blueprint(health_bp, url_prefix="/api/health")
 
-    # Create tables
-    with app.app_context():
-        from app.models import (user, product, cart, order,
-                                category, review, wishlist, address, coupon)  # noqa: F401
-        db.create_all()
+    # Models must be on db.metadata for migrations; no database I/O happens
+    # while building the app, the schema is managed with `flask init-db`
+    from app import models  # noqa: F401
+    from app.commands import register_commands
+    register_commands(app)
+    if click.get_current_context(silent=True) is not None:
+        init_migrations(app)
 
     return app
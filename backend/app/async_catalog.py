@@ -0,0 +1,191 @@
+"""Async read-only catalog API.
+
+An ASGI (Starlette) app that serves the catalog GET endpoints from a SQLAlchemy
+async engine (aiomysql for MySQL, aiosqlite for SQLite), so one process can
+hold thousands of concurrent browse requests while they wait on the database.
+Queries come from ``CatalogService`` and responses from the models' own
+``to_dict``, run through ``AsyncSession.run_sync`` so relationship loads inside
+the serializers work unchanged; responses match the Flask routes.
+
+Every other path is handed to the regular Flask app, mounted behind it and
+run in a thread pool, so ``asgi:app`` is a drop-in replacement for ``wsgi:app``:
+
+    uvicorn asgi:app --workers 4
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+
+The async engine has its own pool (``ASYNC_POOL_SIZE`` / ``ASYNC_MAX_OVERFLOW``)
+next to the Flask app's; point ``ASYNC_DATABASE_URL`` at a replica to move
+catalog reads off the primary.
+"""
+from contextlib import asynccontextmanager
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+from app.config import get_config
+from app.extensions import compressor
+from app.services.catalog_service import CatalogService
+
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url):
+    """Swap the sync driver in ``url`` for its asyncio counterpart."""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for '{url.get_backend_name()}' databases")
+    return url.set(drivername=driver)
+
+
+def _json(request, payload, status_code=200):
+    headers = {"Vary": "Accept-Encoding"}
+    body = JSONResponse(payload).body
+    if compressor.enabled:
+        encoding, body = compressor.compress(body, request.headers.get("accept-encoding"))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    response = Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+    # Same CORS answer as flask-cors gives the Flask app (any origin, with
+    # credentials); preflight OPTIONS requests fall through to Flask
+    origin = request.headers.get("origin")
+    if origin:
+        response.headers["Access-Control-Allow-Origin"] = origin
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers["Vary"] = "Accept-Encoding, Origin"
+    return response
+
+
+class AsyncCatalog:
+
+    def __init__(self, config):
+        url = getattr(config, "ASYNC_DATABASE_URL", None) or async_database_url(config.SQLALCHEMY_DATABASE_URI)
+        options = {"pool_pre_ping": True}
+        if make_url(url).get_backend_name() != "sqlite":
+            options.update(
+                pool_recycle=300,
+                pool_size=getattr(config, "ASYNC_POOL_SIZE", 20),
+                max_overflow=getattr(config, "ASYNC_MAX_OVERFLOW", 20),
+            )
+        self.engine = create_async_engine(url, **options)
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def _page(self, session, stmt, page, per_page):
+        total = await session.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        items = (await session.scalars(stmt.limit(per_page).offset((page - 1) * per_page))).all()
+        return items, total
+
+    async def list_products(self, request):
+        args = request.query_params
+        page, per_page = CatalogService.parse_page(args)
+        async with self.session() as session:
+            items, total = await self._page(session, CatalogService.product_list(args), page, per_page)
+            payload = await session.run_sync(lambda _: CatalogService.page_payload(items, total, page, per_page))
+        return _json(request, payload)
+
+    async def featured_products(self, request):
+        limit = CatalogService.arg(request.query_params, "limit", int, 8)
+        async with self.session() as session:
+            products = (await session.scalars(CatalogService.featured(limit))).all()
+            payload = await session.run_sync(lambda _: {"products": [p.to_dict() for p in products]})
+        return _json(request, payload)
+
+    async def deals(self, request):
+        args = request.query_params
+        limit = CatalogService.arg(args, "limit", int, 8)
+        stmt = CatalogService.deals(limit, args.get("sort"), CatalogService.arg(args, "min_discount", int))
+        async with self.session() as session:
+            products = (await session.scalars(stmt)).all()
+            payload = await session.run_sync(lambda _: {"products": [p.to_dict() for p in products]})
+        return _json(request, payload)
+
+    async def brands(self, request):
+        async with self.session() as session:
+            brands = (await session.scalars(CatalogService.brands())).all()
+        return _json(request, {"brands": list(brands)})
+
+    async def get_product(self, request):
+        from app.models.product import Product
+
+        async with self.session() as session:
+            product = await session.get(Product, request.path_params["product_id"])
+            if not product:
+                return _json(request, {"error": "Product not found"}, 404)
+            payload = await session.run_sync(lambda _: {"product": product.to_dict()})
+        return _json(request, payload)
+
+    async def list_categories(self, request):
+        async with self.session() as session:
+            categories = (await session.scalars(CatalogService.top_categories())).all()
+            payload = await session.run_sync(
+                lambda _: {"categories": [c.to_dict(include_children=True) for c in categories]}
+            )
+        return _json(request, payload)
+
+    async def get_category(self, request):
+        from app.models.category import Category
+
+        category_id = request.path_params["category_id"]
+        args = request.query_params
+        page, per_page = CatalogService.parse_page(args)
+        async with self.session() as session:
+            category = await session.get(Category, category_id)
+            if not category:
+                return _json(request, {"error": "Category not found"}, 404)
+            stmt = CatalogService.category_products(category_id, args.get("sort"))
+            items, total = await self._page(session, stmt, page, per_page)
+            payload = await session.run_sync(lambda _: {
+                "category": category.to_dict(include_children=True),
+                **CatalogService.page_payload(items, total, page, per_page),
+            })
+        return _json(request, payload)
+
+    async def get_category_by_slug(self, request):
+        from app.models.category import Category
+
+        async with self.session() as session:
+            category = await session.scalar(select(Category).where(Category.slug == request.path_params["slug"]))
+            if not category:
+                return _json(request, {"error": "Category not found"}, 404)
+            payload = await session.run_sync(lambda _: {"category": category.to_dict(include_children=True)})
+        return _json(request, payload)
+
+    def routes(self):
+        return [
+            Route("/api/products", self.list_products, methods=["GET"]),
+            Route("/api/products/featured", self.featured_products, methods=["GET"]),
+            Route("/api/products/deals", self.deals, methods=["GET"]),
+            Route("/api/products/brands", self.brands, methods=["GET"]),
+            Route("/api/products/{product_id:int}", self.get_product, methods=["GET"]),
+            Route("/api/categories", self.list_categories, methods=["GET"]),
+            Route("/api/categories/{category_id:int}", self.get_category, methods=["GET"]),
+            Route("/api/categories/slug/{slug}", self.get_category_by_slug, methods=["GET"]),
+        ]
+
+
+def create_async_app(config_class=None, mount_flask=True):
+    """Build the ASGI app; with ``mount_flask`` every other path goes to the Flask app."""
+    if config_class is None or isinstance(config_class, str):
+        config_class = get_config(config_class)
+    catalog = AsyncCatalog(config_class)
+    compressor.configure({key: getattr(config_class, key) for key in dir(config_class) if key.isupper()})
+    routes = catalog.routes()
+    if mount_flask:
+        from a2wsgi import WSGIMiddleware
+        from app import create_app
+
+        routes.append(Mount("/", app=WSGIMiddleware(create_app(config_class))))
+
+    @asynccontextmanager
+    async def lifespan(_app):
+        yield
+        await catalog.engine.dispose()
+
+    asgi_app = Starlette(routes=routes, lifespan=lifespan)
+    asgi_app.state.catalog = catalog
+    return asgi_app
@@ -0,0 +1,120 @@
+import json
+import click
+
+# First migration; databases built by db.create_all() are stamped at it
+BASELINE_REVISION = "bc54b7b26c5d"
+
+
+def upgrade_schema():
+    """Bring the primary database up to the latest migration.
+
+    A schema created by ``db.create_all()`` before migrations existed has no
+    ``alembic_version`` table; it is stamped at the baseline (the schema as
+    it was before any later migration) and upgraded from there. Revisions
+    for tables and columns that ``create_all()`` builds could already have
+    created skip work that is already done.
+    """
+    from flask_migrate import stamp, upgrade
+    from sqlalchemy import inspect
+    from app.extensions import db
+
+    tables = set(inspect(db.engine).get_table_names())
+    if "alembic_version" not in tables and "users" in tables:
+        click.echo(f"Existing schema without migration history, stamping {BASELINE_REVISION}")
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
+
+
+def register_commands(app):
+    """Attach the project's ``flask`` CLI commands to the app."""
+
+    @app.cli.command("init-db")
+    def init_db():
+        """Create or upgrade the database schema by applying migrations."""
+        upgrade_schema()
+        click.echo("Database schema is up to date")
+
+    @app.cli.command("ingest-tracking")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None,
+                  help="File format; inferred from the extension when omitted.")
+    @click.option("--batch-size", type=int, default=None, help="Rows per UPDATE batch.")
+    def ingest_tracking(path, fmt, batch_size):
+        """Apply a carrier tracking file (CSV or NDJSON) to orders."""
+        from app.services.tracking_service import TrackingService
+
+        if fmt is None:
+            fmt = "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+        with open(path, "rb") as f:
+            report, error = TrackingService.ingest(f, fmt=fmt, batch_size=batch_size)
+        if report is not None:
+            click.echo(json.dumps(report, indent=2))
+        if error:
+            raise click.ClickException(error)
+
+    @app.cli.command("build-bought-together")
+    @click.option("--full", is_flag=True, help="Rebuild from all orders instead of only new ones.")
+    @click.option("--top-k", type=int, default=10, show_default=True, help="Neighbors kept per product.")
+    @click.option("--min-support", type=int, default=2, show_default=True,
+                  help="Orders a pair must appear in to be recommended.")
+    def build_bought_together(full, top_k, min_support):
+        """Refresh "frequently bought together" neighbors from recent orders."""
+        from app.services.recommendation_service import RecommendationService
+
+        report = RecommendationService.build_bought_together(top_k=top_k, min_support=min_support, full=full)
+        click.echo(json.dumps(report, indent=2))
+
+    @app.cli.command("build-similar")
+    @click.option("--full", is_flag=True, help="Re-index every product instead of only changed ones.")
+    @click.option("--top-k", type=int, default=10, show_default=True, help="Neighbors kept per product.")
+    def build_similar(full, top_k):
+        """Refresh content-based "similar products" neighbors."""
+        from app.services.recommendation_service import RecommendationService
+
+        report = RecommendationService.build_similar(top_k=top_k, full=full)
+        click.echo(json.dumps(report, indent=2))
+
+    @app.cli.command("recompute-popularity")
+    def recompute_popularity():
+        """Recompute products.popularity_score from recent sales and ratings."""
+        from app.services.popularity_service import PopularityService
+
+        report = PopularityService.recompute()
+        click.echo(json.dumps(report, indent=2))
+
+    @app.cli.command("backfill-purchases")
+    def backfill_purchases():
+        """Rebuild user_purchased_products from existing orders."""
+        from app.services.purchase_index import PurchaseIndex
+
+        rows = PurchaseIndex.backfill()
+        click.echo(f"Indexed {rows} purchased product(s)")
+
+    @app.cli.command("check-query-plans")
+    @click.option("--verbose", is_flag=True, help="Print the offending SQL.")
+    def check_query_plans(verbose):
+        """EXPLAIN the SQL behind the hot read endpoints; exit 1 on full scans or filesorts."""
+        from app.utils.query_plans import check_query_plans as run_checks
+
+        failed = 0
+        for name, path, status, failures in run_checks(app):
+            if status is not None and status >= 400:
+                failures = failures + [("", [f"HTTP {status}"])]
+            click.echo(f"{'FAIL' if failures else 'ok  '}  {name:<30} {path}")
+            for statement, problems in failures:
+                failed += 1
+                for problem in problems:
+                    click.echo(f"        {problem}")
+                if verbose and statement:
+                    click.echo(f"        {' '.join(statement.split())}")
+        if failed:
+            raise SystemExit(1)
+
+    @app.cli.command("purge-revoked-tokens")
+    def purge_revoked_tokens():
+        """Delete blocklist rows for tokens that have already expired."""
+        from app.extensions import token_blocklist
+
+        removed = token_blocklist.purge_expired()
+        click.echo(f"Removed {removed} expired revoked token(s)")
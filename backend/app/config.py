@@ -2,6 +2,20 @@ import os
 from datetime import timedelta
 
 
+def _replica_binds(engine_options):
+    """Binds for ``DATABASE_REPLICA_URLS`` (comma-separated), with ``engine_options``.
+
+    Flask-SQLAlchemy applies ``SQLALCHEMY_ENGINE_OPTIONS`` to the default
+    engine only; a bare URL would leave replicas without pre-ping and recycle,
+    so a stale connection would look like a replica outage to the router.
+    """
+    return {
+        f"replica_{i}": {"url": url.strip(), **engine_options}
+        for i, url in enumerate(os.environ.get("DATABASE_REPLICA_URLS", "").split(","))
+        if url.strip()
+    }
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "super-secret-change-in-production")
 
@@ -15,6 +29,25 @@ class Config:
         "pool_recycle": 300,
         "pool_pre_ping": True,
     }
+    # Checkout waits longer than this are counted as slow in pool metrics
+    DB_POOL_SLOW_CHECKOUT_MS = float(os.environ.get("DB_POOL_SLOW_CHECKOUT_MS", 50))
+
+    # Read replicas (comma-separated URLs); catalog GETs are routed to them
+    SQLALCHEMY_BINDS = _replica_binds(SQLALCHEMY_ENGINE_OPTIONS)
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))   # read-your-writes window
+    REPLICA_RETRY_AFTER = int(os.environ.get("REPLICA_RETRY_AFTER", 30))        # seconds a failed replica is skipped
+
+    # Response compression (gzip, plus brotli when the package is installed)
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "true").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))            # bytes
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_LEVEL = int(os.environ.get("COMPRESS_BROTLI_LEVEL", 5))
+    COMPRESS_CACHE_BYTES = int(os.environ.get("COMPRESS_CACHE_BYTES", 32 * 1024 * 1024))
+
+    # Async catalog app (asgi.py); defaults to DATABASE_URL with the async driver
+    ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL")
+    ASYNC_POOL_SIZE = int(os.environ.get("ASYNC_POOL_SIZE", 20))
+    ASYNC_MAX_OVERFLOW = int(os.environ.get("ASYNC_MAX_OVERFLOW", 20))
 
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "jwt-secret-change-in-production")
@@ -23,3 +56,90 @@ class Config:
     JWT_TOKEN_LOCATION = ["headers"]
     JWT_HEADER_NAME = "Authorization"
     JWT_HEADER_TYPE = "Bearer"
+    JWT_BLOCKLIST_REFRESH = int(os.environ.get("JWT_BLOCKLIST_REFRESH", 5))  # seconds
+    # Recent ids re-read on each refresh, for revocations that commit out of id order
+    JWT_BLOCKLIST_ID_OVERLAP = int(os.environ.get("JWT_BLOCKLIST_ID_OVERLAP", 200))
+
+    # Password hashing: bcrypt cost and the bounded pool that runs it
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+    BCRYPT_POOL_SIZE = int(os.environ.get("BCRYPT_POOL_SIZE", 0)) or None   # default: half the cores
+    BCRYPT_QUEUE_DEPTH = int(os.environ.get("BCRYPT_QUEUE_DEPTH", 8))       # waiting jobs before 503
+    BCRYPT_TIMEOUT = int(os.environ.get("BCRYPT_TIMEOUT", 10))              # seconds
+
+    # Worker processes serving the app; gunicorn.conf.py exports its count
+    WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+
+    # Cart store: "memory://" (single worker only) or "redis://host:6379/0"
+    CART_STORE_URL = os.environ.get("CART_STORE_URL") or "memory://"
+    CART_STORE_ALLOW_MEMORY = True
+    CART_STORE_MAX_USERS = int(os.environ.get("CART_STORE_MAX_USERS", 10000))   # memory:// only
+    CART_STORE_TTL = int(os.environ.get("CART_STORE_TTL", 86400))        # idle seconds before a clean cart is dropped
+    CART_WRITE_BEHIND = os.environ.get("CART_WRITE_BEHIND", "true").lower() == "true"
+    CART_FLUSH_INTERVAL = int(os.environ.get("CART_FLUSH_INTERVAL", 5))   # seconds
+    CART_SNAPSHOT_TTL = int(os.environ.get("CART_SNAPSHOT_TTL", 300))     # seconds
+
+    COUPON_CACHE_TTL = int(os.environ.get("COUPON_CACHE_TTL", 60))        # seconds
+
+    # Wishlist membership cache: "memory://" or "redis://host:6379/0"
+    WISHLIST_CACHE_URL = os.environ.get("WISHLIST_CACHE_URL", "memory://")
+    WISHLIST_CACHE_TTL = int(os.environ.get("WISHLIST_CACHE_TTL", 60))    # seconds
+
+    FACET_CACHE_TTL = int(os.environ.get("FACET_CACHE_TTL", 60))          # seconds
+    REVIEW_STATS_CACHE_TTL = int(os.environ.get("REVIEW_STATS_CACHE_TTL", 300))  # seconds
+    REVIEW_STATS_CACHE_SIZE = int(os.environ.get("REVIEW_STATS_CACHE_SIZE", 10000))  # products
+
+
+def _pool_options(size, overflow, timeout):
+    """Engine options for a QueuePool, overridable per deployment.
+
+    Pools are per worker process and per bind (each replica gets the same
+    sizing): every database sees up to
+    ``workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` connections, which must
+    stay below its ``max_connections``.
+    """
+    return {
+        **Config.SQLALCHEMY_ENGINE_OPTIONS,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", size)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", overflow)),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", timeout)),   # seconds
+    }
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    # Single threaded dev server: a couple of connections is plenty
+    SQLALCHEMY_ENGINE_OPTIONS = _pool_options(size=2, overflow=3, timeout=10)
+    SQLALCHEMY_BINDS = _replica_binds(SQLALCHEMY_ENGINE_OPTIONS)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL", Config.SQLALCHEMY_DATABASE_URI)
+    # Fail fast so a leaked connection shows up as a timeout, not a hang
+    SQLALCHEMY_ENGINE_OPTIONS = _pool_options(size=2, overflow=0, timeout=5)
+    SQLALCHEMY_BINDS = _replica_binds(SQLALCHEMY_ENGINE_OPTIONS)
+
+
+class ProductionConfig(Config):
+    # Sized for one sync gunicorn worker with a handful of threads; raise
+    # DB_POOL_SIZE for threaded/gevent workers
+    SQLALCHEMY_ENGINE_OPTIONS = _pool_options(size=5, overflow=5, timeout=30)
+    SQLALCHEMY_BINDS = _replica_binds(SQLALCHEMY_ENGINE_OPTIONS)
+    # Per-process carts diverge between workers; production needs Redis
+    CART_STORE_ALLOW_MEMORY = False
+
+
+config_by_name = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Return the config class for ``name`` (default: ``APP_ENV``, else development)."""
+    name = name or os.environ.get("APP_ENV", "development")
+    try:
+        return config_by_name[name]
+    except KeyError:
+        raise ValueError(f"Unknown config profile '{name}'. Use one of: {', '.join(config_by_name)}")
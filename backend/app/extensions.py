@@ -1,9 +1,27 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
-from flask_migrate import Migrate
+from app.services.cart_store import CartStore
+from app.services.coupon_cache import CouponCache
+from app.services.wishlist_cache import WishlistCache
+from app.services.facet_cache import FacetCache
+from app.services.review_stats import ReviewStatsCache
+from app.services.password_hasher import PasswordHasher
+from app.services.token_blocklist import TokenBlocklist
+from app.services.replica_router import ReplicaRouter, RoutingSession
+from app.services.pool_metrics import PoolMetrics
+from app.services.compression import Compressor
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 jwt = JWTManager()
 bcrypt = Bcrypt()
-migrate = Migrate()
+cart_store = CartStore()
+coupon_cache = CouponCache()
+wishlist_cache = WishlistCache()
+facet_cache = FacetCache()
+review_stats = ReviewStatsCache()
+password_hasher = PasswordHasher()
+token_blocklist = TokenBlocklist()
+replica_router = ReplicaRouter()
+pool_metrics = PoolMetrics()
+compressor = Compressor()
@@ -1,14 +1,18 @@
 from app.models.user import User
 from app.models.product import Product
 from app.models.cart import Cart
-from app.models.order import Order, OrderItem
+from app.models.order import Order, OrderItem, OrderStatusHistory
 from app.models.category import Category
 from app.models.review import Review
 from app.models.wishlist import Wishlist
 from app.models.address import Address
 from app.models.coupon import Coupon
+from app.models.revoked_token import RevokedToken
+from app.models.recommendation import ProductNeighbor, ProductPairCount, RecommendationRun
+from app.models.purchase import UserPurchasedProduct
 
 __all__ = [
-    "User", "Product", "Cart", "Order", "OrderItem",
-    "Category", "Review", "Wishlist", "Address", "Coupon",
+    "User", "Product", "Cart", "Order", "OrderItem", "OrderStatusHistory",
+    "Category", "Review", "Wishlist", "Address", "Coupon", "RevokedToken",
+    "ProductNeighbor", "ProductPairCount", "RecommendationRun", "UserPurchasedProduct",
 ]
@@ -26,10 +26,17 @@ class Coupon(db.Model):
             return False
         if self.usage_limit and self.times_used >= self.usage_limit:
             return False
-        if self.expires_at and datetime.now(timezone.utc) > self.expires_at:
+        if self.expires_at and datetime.now(timezone.utc) > self.expires_at_utc:
             return False
         return True
 
+    @property
+    def expires_at_utc(self):
+        # MySQL returns naive datetimes; they are stored in UTC
+        if self.expires_at and self.expires_at.tzinfo is None:
+            return self.expires_at.replace(tzinfo=timezone.utc)
+        return self.expires_at
+
     def calculate_discount(self, order_total):
         if order_total < self.min_order_amount:
             return 0
@@ -15,6 +15,7 @@ class Order(db.Model):
     shipping_address = db.Column(db.Text, nullable=True)  # JSON
     payment_method = db.Column(db.String(30), default="COD")  # COD / CARD / UPI
     tracking_number = db.Column(db.String(50), nullable=True)
+    carrier_status = db.Column(db.String(50), nullable=True)  # last status reported by the carrier
     status = db.Column(db.String(20), nullable=False, default="PLACED")
     # PLACED / PROCESSING / SHIPPED / DELIVERED / CANCELLED
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -22,6 +23,14 @@ class Order(db.Model):
 
     # Relationships
     items = db.relationship("OrderItem", backref="order", lazy="joined", cascade="all, delete-orphan")
+    status_history = db.relationship("OrderStatusHistory", backref="order", lazy="dynamic",
+                                     cascade="all, delete-orphan",
+                                     order_by="OrderStatusHistory.created_at")
+
+    __table_args__ = (
+        db.Index("ix_orders_user_created", "user_id", "created_at"),  # a user's order history
+        db.Index("ix_orders_created", "created_at"),  # admin order list / dashboard
+    )
 
     @property
     def address_dict(self):
@@ -43,6 +52,7 @@ class Order(db.Model):
             "shipping_address": self.address_dict,
             "payment_method": self.payment_method,
             "tracking_number": self.tracking_number,
+            "carrier_status": self.carrier_status,
             "status": self.status,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "items": [item.to_dict() for item in self.items],
@@ -70,3 +80,30 @@ class OrderItem(db.Model):
             "price": self.price,
             "product": self.product.to_dict() if self.product else None,
         }
+
+
+class OrderStatusHistory(db.Model):
+    __tablename__ = "order_status_history"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False, index=True)
+    from_status = db.Column(db.String(20), nullable=True)   # NULL for the initial PLACED entry
+    to_status = db.Column(db.String(20), nullable=False)
+    changed_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    note = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index("ix_order_status_history_order_created", "order_id", "created_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "order_id": self.order_id,
+            "from_status": self.from_status,
+            "to_status": self.to_status,
+            "changed_by": self.changed_by,
+            "note": self.note,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -1,5 +1,7 @@
 from app.extensions import db
 from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy.ext.hybrid import hybrid_property
 import json
 
 
@@ -19,6 +21,19 @@ class Product(db.Model):
     is_featured = db.Column(db.Boolean, default=False, index=True)
     is_active = db.Column(db.Boolean, default=True, index=True)
     category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=True, index=True)
+    # Generated by the database from price/compare_price, so every price
+    # change keeps them current and "biggest deals" can be read off an index.
+    # The percentage is rounded as a DECIMAL (half away from zero) on every
+    # backend; the discount_amount / discount_percent properties below fall
+    # back to the same arithmetic in Python until the row is flushed.
+    _discount_amount = db.Column("discount_amount", db.Float, db.Computed(
+        "CASE WHEN compare_price > price THEN compare_price - price ELSE 0 END", persisted=True,
+    ))
+    _discount_percent = db.Column("discount_percent", db.Integer, db.Computed(
+        "CASE WHEN compare_price > price "
+        "THEN ROUND(CAST((1 - price / compare_price) * 100 AS DECIMAL(10, 4))) ELSE 0 END", persisted=True,
+    ))
+    popularity_score = db.Column(db.Float, nullable=False, default=0, server_default="0")  # see PopularityService
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -26,9 +41,62 @@ class Product(db.Model):
     category = db.relationship("Category", backref=db.backref("products", lazy="dynamic", overlaps="category"), overlaps="products")
     reviews = db.relationship("Review", backref="reviewed_product", lazy="dynamic", cascade="all, delete-orphan")
 
+    # Composite indexes follow CatalogService's query shapes: every listing
+    # filters on is_active (and often category_id) and sorts by one column.
+    # `flask check-query-plans` verifies the routes' SQL uses them.
+    __table_args__ = (
+        db.Index("ix_products_active_created", "is_active", "created_at"),
+        db.Index("ix_products_active_price", "is_active", "price"),
+        db.Index("ix_products_active_name", "is_active", "name"),
+        db.Index("ix_products_active_brand", "is_active", "brand"),
+        db.Index("ix_products_active_featured_created", "is_active", "is_featured", "created_at"),
+        db.Index("ix_products_active_popularity", "is_active", "popularity_score"),
+        # deals and sort=discount / min_discount over active products
+        db.Index("ix_products_active_discount", "is_active", "discount_percent"),
+        db.Index("ix_products_active_category_created", "is_active", "category_id", "created_at"),
+        db.Index("ix_products_active_category_price", "is_active", "category_id", "price"),
+        db.Index("ix_products_active_category_name", "is_active", "category_id", "name"),
+        db.Index("ix_products_active_category_popularity", "is_active", "category_id", "popularity_score"),
+    )
+
     def __init__(self, **kwargs):
         super(Product, self).__init__(**kwargs)
 
+    def _discount_pending(self):
+        # New rows, and rows whose prices changed since the last flush, don't
+        # have current generated values yet
+        state = db.inspect(self)
+        if state.key is None:
+            return True
+        return any(state.attrs[key].history.has_changes() for key in ("price", "compare_price"))
+
+    @hybrid_property
+    def discount_amount(self):
+        if self._discount_pending():
+            if self.compare_price is None or self.price is None or not self.compare_price > self.price:
+                return 0.0
+            return self.compare_price - self.price
+        return self._discount_amount
+
+    @discount_amount.inplace.expression
+    @classmethod
+    def _discount_amount_expression(cls):
+        return cls._discount_amount
+
+    @hybrid_property
+    def discount_percent(self):
+        if self._discount_pending():
+            if self.compare_price is None or self.price is None or not self.compare_price > self.price:
+                return 0
+            percent = Decimal((1 - self.price / self.compare_price) * 100)
+            return int(percent.quantize(Decimal("0.0001"), ROUND_HALF_UP).quantize(Decimal(1), ROUND_HALF_UP))
+        return self._discount_percent
+
+    @discount_percent.inplace.expression
+    @classmethod
+    def _discount_percent_expression(cls):
+        return cls._discount_percent
+
     @property
     def is_available(self):
         return self.stock > 0 and self.is_active
@@ -47,12 +115,6 @@ class Product(db.Model):
             return "low_stock"
         return "in_stock"
 
-    @property
-    def discount_percent(self):
-        if self.compare_price and self.compare_price > self.price:
-            return round((1 - self.price / self.compare_price) * 100)
-        return 0
-
     @property
     def avg_rating(self):
         from sqlalchemy import func
@@ -96,6 +158,7 @@ class Product(db.Model):
             "description": self.description,
             "price": self.price,
             "compare_price": self.compare_price,
+            "discount_amount": self.discount_amount,
             "discount_percent": self.discount_percent,
             "stock": self.stock,
             "image_url": self.image_url,
@@ -0,0 +1,23 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+
+class UserPurchasedProduct(db.Model):
+    """Products each user has bought, one row per (user, product).
+
+    ``orders`` counts the user's non-cancelled orders containing the product;
+    the row is removed when it drops to zero. Maintained by ``OrderService``
+    (see ``app/services/purchase_index.py``), so "has this user bought this
+    product" is a primary-key lookup.
+    """
+    __tablename__ = "user_purchased_products"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True,
+                        autoincrement=False)
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True,
+                           autoincrement=False)
+    orders = db.Column(db.Integer, nullable=False, default=1)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __init__(self, **kwargs):
+        super(UserPurchasedProduct, self).__init__(**kwargs)
@@ -0,0 +1,49 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+
+class ProductNeighbor(db.Model):
+    """Precomputed top-K related products, one row per (kind, product, position)."""
+    __tablename__ = "product_neighbors"
+
+    kind = db.Column(db.String(20), primary_key=True)  # bought_together / similar
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    position = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0 = best
+    neighbor_id = db.Column(db.Integer, db.ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    score = db.Column(db.Float, nullable=False)  # lift / cosine similarity
+    support = db.Column(db.Integer, nullable=True)  # orders containing both products
+
+    neighbor = db.relationship("Product", foreign_keys=[neighbor_id], lazy="joined")
+
+    def __init__(self, **kwargs):
+        super(ProductNeighbor, self).__init__(**kwargs)
+
+
+class ProductPairCount(db.Model):
+    """Order co-occurrence counts, upper triangle only (product_id <= other_id).
+
+    The diagonal (product_id == other_id) holds the number of orders that
+    contain the product.
+    """
+    __tablename__ = "product_pair_counts"
+
+    product_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    other_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, **kwargs):
+        super(ProductPairCount, self).__init__(**kwargs)
+
+
+class RecommendationRun(db.Model):
+    """Watermarks of the last recommendation build, one row per kind."""
+    __tablename__ = "recommendation_runs"
+
+    kind = db.Column(db.String(20), primary_key=True)
+    last_order_id = db.Column(db.Integer, nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    last_product_update = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __init__(self, **kwargs):
+        super(RecommendationRun, self).__init__(**kwargs)
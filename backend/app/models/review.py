@@ -16,6 +16,18 @@ class Review(db.Model):
     __table_args__ = (
         db.UniqueConstraint("user_id", "product_id", name="uq_user_product_review"),
         db.CheckConstraint("rating >= 1 AND rating <= 5", name="ck_rating_range"),
+        # review listing sorts (newest / highest / lowest) and the rating distribution
+        db.Index("ix_reviews_product_created", "product_id", "created_at"),
+        db.Index("ix_reviews_product_rating", "product_id", "rating"),
+    )
+
+    # Set when the reviewer has a non-cancelled order for the product; the
+    # review listing joins it explicitly so the badge costs no extra query
+    purchase = db.relationship(
+        "UserPurchasedProduct",
+        primaryjoin="and_(Review.user_id == foreign(UserPurchasedProduct.user_id), "
+                    "Review.product_id == foreign(UserPurchasedProduct.product_id))",
+        viewonly=True, uselist=False, lazy="select",
     )
 
     def __init__(self, **kwargs):
@@ -30,5 +42,6 @@ class Review(db.Model):
             "title": self.title,
             "comment": self.comment,
             "user_name": self.reviewer.name if self.reviewer else "Anonymous",
+            "verified_purchase": self.purchase is not None,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
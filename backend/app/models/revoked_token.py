@@ -0,0 +1,18 @@
+from app.extensions import db
+from datetime import datetime, timezone
+
+
+class RevokedToken(db.Model):
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    jti = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    token_type = db.Column(db.String(10), nullable=False)  # access / refresh / user
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # "user" rows: every token of user_id whose tv claim is below this is revoked
+    token_version = db.Column(db.Integer, nullable=True)
+
+    def __init__(self, **kwargs):
+        super(RevokedToken, self).__init__(**kwargs)
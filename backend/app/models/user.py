@@ -12,6 +12,7 @@ class User(db.Model):
     phone = db.Column(db.String(20), nullable=True)
     avatar = db.Column(db.String(500), nullable=True)
     role = db.Column(db.String(10), nullable=False, default="USER")  # USER / ADMIN
+    token_version = db.Column(db.Integer, nullable=False, default=0)  # bumped to revoke issued tokens
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     # Relationships
@@ -14,6 +14,7 @@ class Wishlist(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "product_id", name="uq_user_product_wishlist"),
+        db.Index("ix_wishlist_user_created", "user_id", "created_at"),
     )
 
     def __init__(self, **kwargs):
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user, get_jwt, decode_token
+from jwt.exceptions import PyJWTError
+from app.extensions import token_blocklist
 from app.services.auth_service import AuthService
-from app.utils.security import validate_required_fields
+from app.utils.security import admin_required, validate_required_fields
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -51,28 +53,68 @@ def login():
     }), 200
 
 
-@auth_bp.route("/profile", methods=["GET"])
+@auth_bp.route("/refresh", methods=["POST"])
+@jwt_required(refresh=True)
+def refresh():
+    """Issue a new token pair and revoke the refresh token that was used."""
+    access_token, refresh_token = AuthService.create_tokens(current_user.user)
+    token_blocklist.revoke(get_jwt())
+    return jsonify({
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+    }), 200
+
+
+@auth_bp.route("/logout", methods=["POST"])
 @jwt_required()
-def profile():
-    user_id = get_jwt_identity()
-    user, error = AuthService.get_profile(int(user_id))
+def logout():
+    """Revoke the current access token and, if given, the matching refresh token."""
+    claims = get_jwt()
+    data = request.get_json(silent=True) or {}
+
+    refresh_claims = None
+    if data.get("refresh_token"):
+        try:
+            refresh_claims = decode_token(data["refresh_token"], allow_expired=True)
+        except PyJWTError:
+            return jsonify({"error": "Invalid refresh token"}), 400
+        if refresh_claims.get("type") != "refresh" or refresh_claims.get("sub") != claims["sub"]:
+            return jsonify({"error": "Invalid refresh token"}), 400
+
+    token_blocklist.revoke(claims)
+    if refresh_claims:
+        token_blocklist.revoke(refresh_claims)
+    return jsonify({"message": "Logged out"}), 200
+
+
+@auth_bp.route("/users/<int:user_id>/role", methods=["PUT"])
+@jwt_required()
+@admin_required
+def change_role(user_id):
+    """Change a user's role (Admin only); revokes the user's existing tokens."""
+    data = request.get_json()
+    if not data or "role" not in data:
+        return jsonify({"error": "role is required"}), 400
+
+    user, error = AuthService.change_role(user_id, data["role"])
     if error:
-        return jsonify({"error": error}), 404
+        return jsonify({"error": error}), 404 if error == "User not found" else 400
+    return jsonify({"message": "Role updated", "user": user.to_dict()}), 200
+
 
-    return jsonify({"user": user.to_dict()}), 200
+@auth_bp.route("/profile", methods=["GET"])
+@jwt_required()
+def profile():
+    return jsonify({"user": current_user.user.to_dict()}), 200
 
 
 @auth_bp.route("/profile", methods=["PUT"])
 @jwt_required()
 def update_profile():
     """Update user profile."""
-    user_id = int(get_jwt_identity())
-    from app.models.user import User
     from app.extensions import db
 
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    user = current_user.user
 
     data = request.get_json()
     if not data:
@@ -1,27 +1,63 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
-from app.models.cart import Cart
+from app.extensions import cart_store
 from app.models.product import Product
+from app.services.cart_service import CartService
 from app.utils.security import validate_required_fields
 
 cart_bp = Blueprint("cart", __name__)
 
 
+def _cart_payload(user_id, lines):
+    cart_items = [
+        {
+            "id": line.get("id"),
+            "user_id": user_id,
+            "product_id": product_id,
+            "quantity": line["quantity"],
+            "product": line["product"],
+        }
+        for product_id, line in lines.items()
+    ]
+    total = sum(item["product"]["price"] * item["quantity"] for item in cart_items if item["product"])
+
+    return {
+        "cart": cart_items,
+        "total": round(total, 2),
+        "item_count": len(cart_items),
+    }
+
+
 @cart_bp.route("", methods=["GET"])
 @jwt_required()
 def get_cart():
-    """Get current user's cart."""
+    """Get current user's cart (served from the cart store)."""
     user_id = int(get_jwt_identity())
-    cart_items = Cart.query.filter_by(user_id=user_id).all()
+    return jsonify(_cart_payload(user_id, cart_store.get_cart(user_id))), 200
 
-    total = sum(item.product.price * item.quantity for item in cart_items if item.product)
 
-    return jsonify({
-        "cart": [item.to_dict() for item in cart_items],
-        "total": round(total, 2),
-        "item_count": len(cart_items),
-    }), 200
+@cart_bp.route("", methods=["PATCH"])
+@jwt_required()
+def patch_cart():
+    """Apply a batch of set/add/remove operations to the cart in one step."""
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+    if not data or "operations" not in data:
+        return jsonify({"error": "operations is required"}), 400
+
+    lines, errors = CartService.apply_operations(user_id, data["operations"])
+    if errors:
+        return jsonify({"error": "Cart was not updated", "errors": errors}), 400
+    return jsonify({"message": "Cart updated", **_cart_payload(user_id, lines)}), 200
+
+
+@cart_bp.route("/quote", methods=["GET"])
+@jwt_required()
+def get_quote():
+    """Price the current cart server-side, optionally with a coupon."""
+    user_id = int(get_jwt_identity())
+    quote = CartService.quote(user_id, request.args.get("coupon", "").strip())
+    return jsonify({"quote": quote}), 200
 
 
 @cart_bp.route("/add", methods=["POST"])
@@ -56,19 +92,13 @@ def add_to_cart():
         }), 400
 
     # Check if item already in cart
-    existing = Cart.query.filter_by(user_id=user_id, product_id=product_id).first()
-    if existing:
-        new_quantity = existing.quantity + quantity
-        if product.stock < new_quantity:
-            return jsonify({
-                "error": f"Cannot add more. Only {product.stock} available (you have {existing.quantity} in cart)"
-            }), 400
-        existing.quantity = new_quantity
-    else:
-        cart_item = Cart(user_id=user_id, product_id=product_id, quantity=quantity)
-        db.session.add(cart_item)
-
-    db.session.commit()
+    in_cart = cart_store.get_quantity(user_id, product_id)
+    if in_cart and product.stock < in_cart + quantity:
+        return jsonify({
+            "error": f"Cannot add more. Only {product.stock} available (you have {in_cart} in cart)"
+        }), 400
+
+    cart_store.add_item(user_id, product, quantity)
     return jsonify({"message": "Product added to cart"}), 200
 
 
@@ -91,16 +121,16 @@ def update_cart():
     if quantity < 1:
         return jsonify({"error": "Quantity must be at least 1"}), 400
 
-    cart_item = Cart.query.filter_by(user_id=user_id, product_id=product_id).first()
-    if not cart_item:
+    if not cart_store.get_quantity(user_id, product_id):
         return jsonify({"error": "Item not in cart"}), 404
 
     product = Product.query.get(product_id)
-    if product and product.stock < quantity:
+    if not product:
+        return jsonify({"error": "Product not found"}), 404
+    if product.stock < quantity:
         return jsonify({"error": "Insufficient stock"}), 400
 
-    cart_item.quantity = quantity
-    db.session.commit()
+    cart_store.set_item(user_id, product, quantity)
 
     return jsonify({"message": "Cart updated"}), 200
 
@@ -111,11 +141,7 @@ def remove_from_cart(product_id):
     """Remove an item from cart."""
     user_id = int(get_jwt_identity())
 
-    cart_item = Cart.query.filter_by(user_id=user_id, product_id=product_id).first()
-    if not cart_item:
+    if not cart_store.remove_item(user_id, product_id):
         return jsonify({"error": "Item not in cart"}), 404
 
-    db.session.delete(cart_item)
-    db.session.commit()
-
     return jsonify({"message": "Item removed from cart"}), 200
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.extensions import db
 from app.models.category import Category
+from app.services.catalog_service import CatalogService
 from app.utils.security import admin_required
 
 category_bp = Blueprint("categories", __name__)
@@ -10,7 +11,7 @@ category_bp = Blueprint("categories", __name__)
 @category_bp.route("", methods=["GET"])
 def get_categories():
     """Get all top-level categories with children."""
-    categories = Category.query.filter_by(parent_id=None).order_by(Category.name).all()
+    categories = db.session.scalars(CatalogService.top_categories()).all()
     return jsonify({
         "categories": [c.to_dict(include_children=True) for c in categories]
     }), 200
@@ -23,30 +24,13 @@ def get_category(category_id):
     if not category:
         return jsonify({"error": "Category not found"}), 404
 
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 12, type=int)
-    sort = request.args.get("sort", "newest")
-
-    from app.models.product import Product
-    query = Product.query.filter_by(category_id=category_id, is_active=True)
-
-    if sort == "price_low":
-        query = query.order_by(Product.price.asc())
-    elif sort == "price_high":
-        query = query.order_by(Product.price.desc())
-    elif sort == "name":
-        query = query.order_by(Product.name.asc())
-    else:
-        query = query.order_by(Product.created_at.desc())
-
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    page, per_page = CatalogService.parse_page(request.args)
+    pagination = db.paginate(CatalogService.category_products(category_id, request.args.get("sort")),
+                             page=page, per_page=per_page, error_out=False)
 
     return jsonify({
         "category": category.to_dict(include_children=True),
-        "products": [p.to_dict() for p in pagination.items],
-        "total": pagination.total,
-        "pages": pagination.pages,
-        "current_page": pagination.page,
+        **CatalogService.page_payload(pagination.items, pagination.total, pagination.page, per_page),
     }), 200
 
 
@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from app.extensions import db
+from app.extensions import db, coupon_cache
 from app.models.coupon import Coupon
-from app.utils.security import admin_required
+from app.services.cart_service import CartService
+from app.services.pricing_service import PricingService
+from app.utils.security import admin_required, is_admin
 
 coupon_bp = Blueprint("coupons", __name__)
 
@@ -27,7 +29,7 @@ def validate_coupon():
     
     if coupon.expires_at:
         from datetime import datetime, timezone
-        if datetime.now(timezone.utc) > coupon.expires_at:
+        if datetime.now(timezone.utc) > coupon.expires_at_utc:
             return jsonify({"error": "This coupon has expired"}), 400
 
     order_total = data.get("order_total", 0)
@@ -47,17 +49,30 @@ def validate_coupon():
     }), 200
 
 
+@coupon_bp.route("/best-for-cart", methods=["GET"])
+@jwt_required()
+def best_for_cart():
+    """Rank every active coupon by the discount it gives on the current cart."""
+    from flask_jwt_extended import get_jwt_identity
+
+    user_id = int(get_jwt_identity())
+    limit = min(max(request.args.get("limit", 5, type=int), 1), 50)
+
+    subtotal = CartService.quote(user_id)["subtotal"]
+    ranked = PricingService.rank_coupons(coupon_cache.table(), subtotal, limit=limit)
+
+    return jsonify({
+        "subtotal": subtotal,
+        "best": ranked[0] if ranked else None,
+        "coupons": ranked,
+    }), 200
+
+
 @coupon_bp.route("", methods=["GET"])
 @jwt_required()
 def get_coupons():
     """Get coupons - users see active coupons, admin sees all."""
-    from flask_jwt_extended import get_jwt_identity
-    from app.models.user import User
-    
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    
-    if user and user.role == "ADMIN":
+    if is_admin():
         # Admin sees all coupons
         coupons = Coupon.query.order_by(Coupon.created_at.desc()).all()
     else:
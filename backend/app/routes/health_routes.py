@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db, pool_metrics
+from app.utils.security import admin_required
+
+health_bp = Blueprint("health", __name__)
+
+
+@health_bp.route("", methods=["GET"])
+def health():
+    """Liveness check including a round trip to the primary database."""
+    try:
+        db.session.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        db.session.rollback()
+        return jsonify({"status": "error", "database": "unreachable"}), 503
+    return jsonify({"status": "ok", "database": "ok"}), 200
+
+
+@health_bp.route("/metrics", methods=["GET"])
+@jwt_required()
+@admin_required
+def metrics():
+    """Connection pool state and checkout wait statistics for this worker process."""
+    return jsonify(pool_metrics.snapshot()), 200
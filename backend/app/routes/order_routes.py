@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.order_service import OrderService
-from app.utils.security import admin_required
-from app.models.user import User
+from app.services.tracking_service import TrackingService
+from app.utils.security import admin_required, is_admin
 from app.models.order import Order
 from app.extensions import db
 
@@ -31,10 +31,8 @@ def place_order():
 def get_orders():
     """Get orders — user sees own orders, admin sees all."""
     user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
 
-    if user and user.role == "ADMIN":
-        from app.models.order import Order
+    if is_admin():
         orders = Order.query.order_by(Order.created_at.desc()).all()
     else:
         orders = OrderService.get_user_orders(user_id)
@@ -47,10 +45,7 @@ def get_orders():
 def get_order(order_id):
     """Get a single order by ID."""
     user_id = get_jwt_identity()
-    user = User.query.get(int(user_id))
-    is_admin = user and user.role == "ADMIN"
-
-    order, error = OrderService.get_order_by_id(order_id, user_id=user_id, is_admin=is_admin)
+    order, error = OrderService.get_order_by_id(order_id, user_id=user_id, is_admin=is_admin())
     if error:
         return jsonify({"error": error}), 404
     return jsonify({"order": order.to_dict()}), 200
@@ -65,12 +60,88 @@ def update_order_status(order_id):
     if not data or "status" not in data:
         return jsonify({"error": "Status is required"}), 400
 
-    order, error = OrderService.update_status(order_id, data["status"])
+    order, error = OrderService.update_status(
+        order_id,
+        data["status"],
+        changed_by=int(get_jwt_identity()),
+        note=data.get("note"),
+    )
     if error:
-        return jsonify({"error": error}), 400
+        status_code = 404 if error == "Order not found" else 400
+        return jsonify({"error": error}), status_code
     return jsonify({"message": "Order status updated", "order": order.to_dict()}), 200
 
 
+@order_bp.route("/bulk-status", methods=["PUT"])
+@jwt_required()
+@admin_required
+def bulk_update_order_status():
+    """Move many orders to a new status in one transaction (Admin only)."""
+    data = request.get_json()
+    if not data or "status" not in data or not data.get("order_ids"):
+        return jsonify({"error": "status and order_ids are required"}), 400
+
+    try:
+        order_ids = [int(oid) for oid in data["order_ids"]]
+    except (ValueError, TypeError):
+        return jsonify({"error": "order_ids must be a list of integers"}), 400
+
+    results, error = OrderService.bulk_update_status(
+        order_ids,
+        data["status"],
+        changed_by=int(get_jwt_identity()),
+        note=data.get("note"),
+    )
+    if error:
+        return jsonify({"error": error}), 400
+
+    updated = sum(1 for r in results if r["success"])
+    return jsonify({
+        "message": f"{updated} order(s) updated",
+        "updated": updated,
+        "failed": len(results) - updated,
+        "results": results,
+    }), 200
+
+
+@order_bp.route("/tracking/ingest", methods=["POST"])
+@jwt_required()
+@admin_required
+def ingest_tracking():
+    """Apply a carrier CSV/NDJSON status file to orders (Admin only).
+
+    Accepts either a multipart ``file`` upload or the raw request body.
+    """
+    upload = request.files.get("file")
+    stream = upload.stream if upload else request.stream
+    filename = (upload.filename or "") if upload else ""
+    content_type = (upload.mimetype if upload else request.mimetype) or ""
+
+    fmt = request.args.get("format", "").lower()
+    if not fmt:
+        is_ndjson = "ndjson" in content_type or "jsonl" in content_type \
+            or filename.endswith((".ndjson", ".jsonl"))
+        fmt = "ndjson" if is_ndjson else "csv"
+
+    report, error = TrackingService.ingest(stream, fmt=fmt)
+    if error:
+        # A read error partway through still reports the batches already applied
+        return jsonify({"error": error, **(report or {})}), 400
+    return jsonify({"message": f"{report['updated']} order(s) updated", **report}), 200
+
+
+@order_bp.route("/<int:order_id>/history", methods=["GET"])
+@jwt_required()
+def get_order_history(order_id):
+    """Get the status transition log for an order."""
+    user_id = get_jwt_identity()
+    order, error = OrderService.get_order_by_id(order_id, user_id=user_id, is_admin=is_admin())
+    if error:
+        return jsonify({"error": error}), 404
+    history = OrderService.get_status_history(order.id)
+    return jsonify({"order_id": order.id, "history": [h.to_dict() for h in history]}), 200
+
+
 @order_bp.route("/stats", methods=["GET"])
 @jwt_required()
 @admin_required
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from app.extensions import db
+from app.extensions import db, facet_cache
 from app.models.product import Product
+from app.services.catalog_service import CatalogService
+from app.services.recommendation_service import BOUGHT_TOGETHER, SIMILAR, RecommendationService
 from app.utils.security import admin_required, validate_required_fields
 import json
 
@@ -11,65 +13,24 @@ product_bp = Blueprint("products", __name__)
 @product_bp.route("", methods=["GET"])
 def get_products():
     """Get all products with search, filter, sort, pagination."""
-    search = request.args.get("search", "").strip()
-    min_price = request.args.get("min_price", type=float)
-    max_price = request.args.get("max_price", type=float)
-    category_id = request.args.get("category_id", type=int)
-    brand = request.args.get("brand", "").strip()
-    featured = request.args.get("featured", "").lower()
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 12, type=int)
-
-    query = Product.query.filter_by(is_active=True)
-
-    if search:
-        query = query.filter(
-            db.or_(
-                Product.name.ilike(f"%{search}%"),
-                Product.description.ilike(f"%{search}%"),
-                Product.brand.ilike(f"%{search}%"),
-            )
-        )
-    if category_id:
-        query = query.filter(Product.category_id == category_id)
-    if brand:
-        query = query.filter(Product.brand.ilike(f"%{brand}%"))
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
-    if featured == "true":
-        query = query.filter(Product.is_featured == True)
-
-    # Sort options
-    sort = request.args.get("sort", "newest")
-    if sort == "price_low":
-        query = query.order_by(Product.price.asc())
-    elif sort == "price_high":
-        query = query.order_by(Product.price.desc())
-    elif sort == "name":
-        query = query.order_by(Product.name.asc())
-    elif sort == "popular":
-        query = query.order_by(Product.is_featured.desc(), Product.created_at.desc())
-    else:
-        query = query.order_by(Product.created_at.desc())
-
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    page, per_page = CatalogService.parse_page(request.args)
+    pagination = db.paginate(CatalogService.product_list(request.args),
+                             page=page, per_page=per_page, error_out=False)
+    return jsonify(CatalogService.page_payload(pagination.items, pagination.total, pagination.page, per_page)), 200
 
-    return jsonify({
-        "products": [p.to_dict() for p in pagination.items],
-        "total": pagination.total,
-        "pages": pagination.pages,
-        "current_page": pagination.page,
-    }), 200
+
+@product_bp.route("/facets", methods=["GET"])
+def get_product_facets():
+    """Counts per brand, category, price, stock status and rating for the current filters."""
+    filters = CatalogService.parse_product_filters(request.args)
+    return jsonify(facet_cache.facets(filters)), 200
 
 
 @product_bp.route("/featured", methods=["GET"])
 def get_featured_products():
     """Get featured products for homepage."""
     limit = request.args.get("limit", 8, type=int)
-    products = Product.query.filter_by(is_featured=True, is_active=True)\
-        .order_by(Product.created_at.desc()).limit(limit).all()
+    products = db.session.scalars(CatalogService.featured(limit)).all()
     return jsonify({"products": [p.to_dict() for p in products]}), 200
 
 
@@ -77,21 +38,49 @@ def get_featured_products():
 def get_deals():
     """Get products with discounts."""
     limit = request.args.get("limit", 8, type=int)
-    products = Product.query.filter(
-        Product.compare_price.isnot(None),
-        Product.compare_price > Product.price,
-        Product.is_active == True,
-    ).order_by(Product.created_at.desc()).limit(limit).all()
+    stmt = CatalogService.deals(limit, request.args.get("sort"), request.args.get("min_discount", type=int))
+    products = db.session.scalars(stmt).all()
     return jsonify({"products": [p.to_dict() for p in products]}), 200
 
 
 @product_bp.route("/brands", methods=["GET"])
 def get_brands():
     """Get all distinct brands."""
-    brands = db.session.query(Product.brand)\
-        .filter(Product.brand.isnot(None), Product.brand != "", Product.is_active == True)\
-        .distinct().order_by(Product.brand).all()
-    return jsonify({"brands": [b[0] for b in brands]}), 200
+    brands = db.session.scalars(CatalogService.brands()).all()
+    return jsonify({"brands": brands}), 200
+
+
+@product_bp.route("/batch", methods=["GET"])
+def get_products_batch():
+    """Get active products by a comma-separated id list, in request order (inactive ids are not found)."""
+    raw_ids = [i for i in request.args.get("ids", "").split(",") if i.strip()]
+    if not raw_ids:
+        return jsonify({"error": "ids is required"}), 400
+    if len(raw_ids) > 300:
+        return jsonify({"error": "At most 300 ids per request"}), 400
+    try:
+        ids = [int(i) for i in raw_ids]
+    except ValueError:
+        return jsonify({"error": "ids must be integers"}), 400
+
+    full = request.args.get("view", "summary").lower() == "full"
+    query = Product.query.filter(Product.id.in_(set(ids)), Product.is_active == True)
+    if full:
+        query = query.options(db.joinedload(Product.category))
+    found = {p.id: p for p in query.all()}
+
+    products = []
+    for product_id in ids:
+        product = found.get(product_id)
+        if product is None:
+            products.append({"id": product_id, "found": False})
+        else:
+            products.append({**(product.to_dict() if full else product.to_summary()), "found": True})
+
+    return jsonify({
+        "products": products,
+        "not_found": [pid for pid in ids if pid not in found],
+    }), 200
 
 
 @product_bp.route("/<int:product_id>", methods=["GET"])
@@ -103,6 +92,22 @@ def get_product(product_id):
     return jsonify({"product": product.to_dict()}), 200
 
 
+@product_bp.route("/<int:product_id>/bought-together", methods=["GET"])
+def get_bought_together(product_id):
+    """Products frequently bought together with this one (precomputed)."""
+    limit = min(request.args.get("limit", 8, type=int), RecommendationService.MAX_NEIGHBORS)
+    products = RecommendationService.neighbors(BOUGHT_TOGETHER, product_id, limit)
+    return jsonify({"product_id": product_id, "products": products}), 200
+
+
+@product_bp.route("/<int:product_id>/similar", methods=["GET"])
+def get_similar_products(product_id):
+    """Products with similar names and descriptions (precomputed)."""
+    limit = min(request.args.get("limit", 8, type=int), RecommendationService.MAX_NEIGHBORS)
+    products = RecommendationService.neighbors(SIMILAR, product_id, limit)
+    return jsonify({"product_id": product_id, "products": products}), 200
+
+
 @product_bp.route("", methods=["POST"])
 @jwt_required()
 @admin_required
@@ -1,9 +1,14 @@
+import math
+
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
+from sqlalchemy.orm import joinedload
+from app.extensions import db, review_stats
 from app.models.review import Review
 from app.models.product import Product
-from app.models.order import Order, OrderItem
+from app.models.user import User
+from app.services.catalog_service import CatalogService
+from app.services.purchase_index import PurchaseIndex
 
 review_bp = Blueprint("reviews", __name__)
 
@@ -11,15 +16,16 @@ review_bp = Blueprint("reviews", __name__)
 @review_bp.route("/product/<int:product_id>", methods=["GET"])
 def get_product_reviews(product_id):
     """Get all reviews for a product."""
-    product = Product.query.get(product_id)
-    if not product:
+    # Cached stats also tell us whether the product exists
+    stats = review_stats.get(product_id)
+    if stats is None:
         return jsonify({"error": "Product not found"}), 404
 
-    page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 10, type=int)
+    page, per_page = CatalogService.parse_page(request.args, default_per_page=10)
     sort = request.args.get("sort", "newest")
 
-    query = Review.query.filter_by(product_id=product_id)
+    query = Review.query.filter_by(product_id=product_id)\
+        .options(joinedload(Review.reviewer).load_only(User.name), joinedload(Review.purchase))
 
     if sort == "highest":
         query = query.order_by(Review.rating.desc())
@@ -28,28 +34,16 @@ def get_product_reviews(product_id):
     else:
         query = query.order_by(Review.created_at.desc())
 
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-
-    # Calculate rating distribution
-    from sqlalchemy import func
-    distribution = db.session.query(
-        Review.rating, func.count(Review.id)
-    ).filter_by(product_id=product_id).group_by(Review.rating).all()
-    rating_dist = {str(i): 0 for i in range(1, 6)}
-    for rating, count in distribution:
-        rating_dist[str(rating)] = count
-
-    total_reviews = sum(rating_dist.values())
-    avg = db.session.query(func.avg(Review.rating)).filter_by(product_id=product_id).scalar()
+    # The stats already count the reviews, so the page needs no COUNT query
+    reviews = query.limit(per_page).offset((page - 1) * per_page).all()
+    total = stats["total_reviews"]
 
     return jsonify({
-        "reviews": [r.to_dict() for r in pagination.items],
-        "total": pagination.total,
-        "pages": pagination.pages,
-        "current_page": pagination.page,
-        "avg_rating": round(float(avg), 1) if avg else 0,
-        "total_reviews": total_reviews,
-        "rating_distribution": rating_dist,
+        "reviews": [r.to_dict() for r in reviews],
+        "total": total,
+        "pages": math.ceil(total / per_page) if total else 0,
+        "current_page": page,
+        **stats,
     }), 200
 
 
@@ -84,14 +78,7 @@ def create_review():
     except (ValueError, TypeError):
         return jsonify({"error": "Invalid rating"}), 400
 
-    # Check if user has purchased this product
-    has_purchased = db.session.query(OrderItem).join(Order).filter(
-        Order.user_id == user_id,
-        OrderItem.product_id == product_id,
-        Order.status.in_(["PLACED", "SHIPPED", "DELIVERED"])
-    ).first()
-
-    if not has_purchased:
+    if not PurchaseIndex.has_purchased(user_id, product.id):
         return jsonify({"error": "You can only review products you have purchased"}), 403
 
     review = Review(
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
+from app.extensions import db, cart_store, wishlist_cache
 from app.models.wishlist import Wishlist
 from app.models.product import Product
 
@@ -41,6 +41,7 @@ def add_to_wishlist():
     item = Wishlist(user_id=user_id, product_id=product_id)
     db.session.add(item)
     db.session.commit()
+    wishlist_cache.added(user_id, product_id)
 
     return jsonify({"message": "Added to wishlist"}), 201
 
@@ -56,6 +57,7 @@ def remove_from_wishlist(product_id):
 
     db.session.delete(item)
     db.session.commit()
+    wishlist_cache.removed(user_id, product_id)
     return jsonify({"message": "Removed from wishlist"}), 200
 
 
@@ -64,8 +66,29 @@ def remove_from_wishlist(product_id):
 def check_wishlist(product_id):
     """Check if a product is in the user's wishlist."""
     user_id = int(get_jwt_identity())
-    exists = Wishlist.query.filter_by(user_id=user_id, product_id=product_id).first() is not None
-    return jsonify({"in_wishlist": exists}), 200
+    return jsonify({"in_wishlist": product_id in wishlist_cache.get(user_id)}), 200
+
+
+@wishlist_bp.route("/check", methods=["POST"])
+@jwt_required()
+def check_wishlist_batch():
+    """Check wishlist membership for a list of product ids."""
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+    if not data or not isinstance(data.get("product_ids"), list):
+        return jsonify({"error": "product_ids must be a list"}), 400
+    if len(data["product_ids"]) > 500:
+        return jsonify({"error": "At most 500 product ids per request"}), 400
+
+    try:
+        product_ids = [int(pid) for pid in data["product_ids"]]
+    except (ValueError, TypeError):
+        return jsonify({"error": "product_ids must be integers"}), 400
+
+    wishlisted = wishlist_cache.get(user_id)
+    return jsonify({
+        "in_wishlist": {str(pid): pid in wishlisted for pid in product_ids},
+    }), 200
 
 
 @wishlist_bp.route("/move-to-cart/<int:product_id>", methods=["POST"])
@@ -82,15 +105,9 @@ def move_to_cart(product_id):
     if not product or not product.is_available:
         return jsonify({"error": "Product is not available"}), 400
 
-    from app.models.cart import Cart
-    existing_cart = Cart.query.filter_by(user_id=user_id, product_id=product_id).first()
-    if existing_cart:
-        existing_cart.quantity += 1
-    else:
-        cart_item = Cart(user_id=user_id, product_id=product_id, quantity=1)
-        db.session.add(cart_item)
-
     db.session.delete(wishlist_item)
     db.session.commit()
+    wishlist_cache.removed(user_id, product_id)
+    cart_store.add_item(user_id, product, 1)
 
     return jsonify({"message": "Moved to cart"}), 200
@@ -1,6 +1,8 @@
 import re
-from app.extensions import db, bcrypt
+from app.extensions import db, password_hasher, token_blocklist
 from app.models.user import User
+from app.services.password_hasher import PasswordHasherBusy
+from app.utils.security import token_claims
 from flask_jwt_extended import create_access_token, create_refresh_token
 
 
@@ -24,7 +26,7 @@ class AuthService:
         if role not in ("USER", "ADMIN"):
             return None, "Invalid role"
 
-        password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        password_hash = password_hasher.hash(password)
         user = User(
             name=name.strip(),
             email=email.lower().strip(),
@@ -39,14 +41,43 @@ class AuthService:
     @staticmethod
     def login(email, password):
         user = User.query.filter_by(email=email.lower().strip()).first()
-        if not user or not bcrypt.check_password_hash(user.password_hash, password):
+        if not user or not password_hasher.verify(user.password_hash, password):
             return None, None, "Invalid email or password"
 
-        access_token = create_access_token(identity=str(user.id))
-        refresh_token = create_refresh_token(identity=str(user.id))
+        # Upgrade hashes made with an older cost factor while we have the password
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = password_hasher.hash(password)
+                db.session.commit()
+            except PasswordHasherBusy:
+                pass
 
+        access_token, refresh_token = AuthService.create_tokens(user)
         return access_token, refresh_token, None
 
+    @staticmethod
+    def create_tokens(user):
+        claims = token_claims(user)
+        access_token = create_access_token(identity=str(user.id), additional_claims=claims)
+        refresh_token = create_refresh_token(identity=str(user.id), additional_claims=claims)
+        return access_token, refresh_token
+
+    @staticmethod
+    def change_role(user_id, role):
+        """Change a user's role and revoke every token issued with the old one."""
+        if role not in ("USER", "ADMIN"):
+            return None, "Invalid role"
+        user = User.query.get(user_id)
+        if not user:
+            return None, "User not found"
+        if user.role != role:
+            user.role = role
+            user.token_version = (user.token_version or 0) + 1
+            # Commits the role change too; every worker rejects the old tokens
+            # from its in-memory blocklist without loading the user
+            token_blocklist.revoke_user(user.id, user.token_version)
+        return user, None
+
     @staticmethod
     def get_profile(user_id):
         user = User.query.get(user_id)
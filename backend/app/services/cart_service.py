@@ -0,0 +1,110 @@
+from app.extensions import cart_store, coupon_cache
+from app.models.product import Product
+from app.services.pricing_service import PricingService
+
+
+class CartService:
+
+    OPERATIONS = ("set", "add", "remove")
+    MAX_OPERATIONS = 200
+
+    @staticmethod
+    def _parse_operations(operations):
+        parsed, errors = [], []
+        for index, op in enumerate(operations):
+            if not isinstance(op, dict) or op.get("op") not in CartService.OPERATIONS:
+                errors.append({"index": index, "error": f"op must be one of: {', '.join(CartService.OPERATIONS)}"})
+                continue
+            try:
+                product_id = int(op.get("product_id"))
+                quantity = int(op.get("quantity", 1)) if op["op"] != "remove" else 0
+            except (ValueError, TypeError):
+                errors.append({"index": index, "error": "product_id and quantity must be integers"})
+                continue
+            if op["op"] == "add" and quantity < 1:
+                errors.append({"index": index, "error": "Quantity must be at least 1"})
+                continue
+            if op["op"] == "set" and quantity < 0:
+                errors.append({"index": index, "error": "Quantity cannot be negative"})
+                continue
+            parsed.append((index, op["op"], product_id, quantity))
+        return parsed, errors
+
+    @staticmethod
+    def apply_operations(user_id, operations):
+        """Apply a list of set/add/remove operations to the cart atomically.
+
+        Products are loaded with one ``IN`` query and the cart once from the
+        cart store. Either every operation is applied or none is; on failure a
+        list of per-operation errors is returned.
+        """
+        if not isinstance(operations, list) or not operations:
+            return None, [{"error": "operations must be a non-empty list"}]
+        if len(operations) > CartService.MAX_OPERATIONS:
+            return None, [{"error": f"At most {CartService.MAX_OPERATIONS} operations per request"}]
+
+        parsed, errors = CartService._parse_operations(operations)
+        if errors:
+            return None, errors
+
+        product_ids = {product_id for _, _, product_id, _ in parsed}
+        products = {p.id: p for p in Product.query.filter(Product.id.in_(product_ids)).all()}
+
+        def apply(lines):
+            quantities = {pid: line["quantity"] for pid, line in lines.items()}
+            last_index = {}
+            for index, op, product_id, quantity in parsed:
+                if op == "remove":
+                    if product_id not in quantities:
+                        errors.append({"index": index, "product_id": product_id, "error": "Item not in cart"})
+                    quantities.pop(product_id, None)
+                    continue
+                product = products.get(product_id)
+                if not product:
+                    errors.append({"index": index, "product_id": product_id, "error": "Product not found"})
+                    continue
+                new_quantity = quantity if op == "set" else quantities.get(product_id, 0) + quantity
+                if new_quantity > 0 and not product.is_available:
+                    errors.append({"index": index, "product_id": product_id, "error": "Product is out of stock"})
+                    continue
+                quantities[product_id] = new_quantity
+                last_index[product_id] = index
+
+            # Stock is validated against the final quantities, not each step
+            for product_id, quantity in quantities.items():
+                product = products.get(product_id)
+                if product and product_id in last_index and product.stock < quantity:
+                    errors.append({
+                        "index": last_index[product_id],
+                        "product_id": product_id,
+                        "error": f"Insufficient stock for '{product.name}'. Only {product.stock} available",
+                    })
+            if errors:
+                return False
+
+            for product_id in list(lines):
+                if quantities.get(product_id, 0) <= 0:
+                    del lines[product_id]
+            for product_id in last_index:
+                if quantities.get(product_id, 0) > 0:
+                    cart_store.set_line(lines, products[product_id], quantities[product_id])
+            return True
+
+        cart_store.mutate(user_id, apply)
+        if errors:
+            return None, errors
+        return cart_store.get_cart(user_id), None
+
+    @staticmethod
+    def quote(user_id, coupon_code=None):
+        """Price the user's cart with fresh product prices (one ``IN`` query)."""
+        quantities = {pid: line["quantity"] for pid, line in cart_store.get_cart(user_id).items()}
+        products = {}
+        if quantities:
+            products = {p.id: p for p in Product.query.filter(Product.id.in_(quantities)).all()}
+
+        return PricingService.price_items(
+            ((pid, products.get(pid), qty) for pid, qty in quantities.items()),
+            coupon=coupon_cache.get(coupon_code),
+            coupon_code=coupon_code or None,
+        )
@@ -0,0 +1,387 @@
+"""Cart store: a fast tier in front of the ``cart`` table.
+
+Carts are read and mutated in the store and written back to MySQL either by a
+background flusher (write-behind) or synchronously when the cart is needed in
+the database, e.g. at checkout.
+
+Durability and recovery
+-----------------------
+* ``memory://`` keeps carts in the worker process. Mutations that have not
+  been flushed yet are lost if the process dies; at most
+  ``CART_FLUSH_INTERVAL`` seconds of cart edits can be lost. Each worker has
+  its own copy, and a flush from a stale copy would overwrite lines added
+  through another worker, so this backend is refused when
+  ``WEB_CONCURRENCY`` is above 1 and in the production profile. Use it for
+  development and tests. Clean carts are evicted least recently used first
+  beyond ``CART_STORE_MAX_USERS`` and after ``CART_STORE_TTL`` idle seconds.
+* ``redis://...`` keeps carts in Redis and shares them between workers. The
+  dirty set lives in Redis too, so any worker's flusher persists pending carts
+  and a crashed worker loses nothing that Redis still holds. Cart keys expire
+  ``CART_STORE_TTL`` seconds after their last write.
+* On a cache miss the cart is loaded from the ``cart`` table, so after a
+  restart (or an eviction of a clean cart) users see their last flushed cart.
+* Flushes run under the user's cart lock, and checkout holds that lock from
+  its initial flush until the cart is cleared, so the flusher can never write
+  back lines that were just ordered and orders are placed from exactly what
+  the user saw.
+* Product snapshots stored with each line are refreshed on every mutation and
+  expire after ``CART_SNAPSHOT_TTL`` seconds; ``place_order`` re-prices
+  from the ``products`` table regardless.
+* With ``CART_WRITE_BEHIND = False`` every mutation is written through
+  immediately, trading write load for durability.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class MemoryCartBackend:
+    """In-process backend; one LRU dict per worker."""
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, max_users=10000, ttl=86400):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._carts = OrderedDict()   # user_id -> (lines, last used)
+        self._dirty = set()
+        self._flushing = set()
+        self._lock = threading.RLock()
+        self._user_locks = [threading.RLock() for _ in range(self.LOCK_STRIPES)]
+
+    @contextmanager
+    def lock(self, user_id, timeout=5):
+        with self._user_locks[hash(user_id) % self.LOCK_STRIPES]:
+            yield
+
+    def _pinned(self, user_id):
+        # Carts with unflushed edits must not be evicted
+        return user_id in self._dirty or user_id in self._flushing
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._carts.get(user_id)
+            if entry is None:
+                return None
+            cart, used_at = entry
+            now = time.time()
+            if now - used_at > self.ttl and not self._pinned(user_id):
+                del self._carts[user_id]
+                return None
+            self._carts[user_id] = (cart, now)
+            self._carts.move_to_end(user_id)
+            return {pid: dict(line) for pid, line in cart.items()}
+
+    def put(self, user_id, lines):
+        with self._lock:
+            self._carts[user_id] = ({pid: dict(line) for pid, line in lines.items()}, time.time())
+            self._carts.move_to_end(user_id)
+            if len(self._carts) > self.max_users:
+                self._evict()
+
+    def _evict(self):
+        excess = len(self._carts) - self.max_users
+        victims = []
+        for user_id in self._carts:
+            if len(victims) >= excess:
+                break
+            if not self._pinned(user_id):
+                victims.append(user_id)
+        for user_id in victims:
+            del self._carts[user_id]
+
+    def delete(self, user_id):
+        with self._lock:
+            self._carts.pop(user_id, None)
+            self._dirty.discard(user_id)
+
+    def mark_dirty(self, user_id):
+        with self._lock:
+            self._dirty.add(user_id)
+
+    def pop_dirty(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._flushing |= dirty
+            return list(dirty)
+
+    def flushed(self, user_id):
+        with self._lock:
+            self._flushing.discard(user_id)
+
+
+class RedisCartBackend:
+    """Redis-backed store shared by all workers; one hash per user."""
+
+    def __init__(self, url, prefix="cart", ttl=86400):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CART_STORE_URL points at Redis but the 'redis' package is not installed") from e
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, user_id):
+        return f"{self._prefix}:{user_id}"
+
+    @contextmanager
+    def lock(self, user_id, timeout=5):
+        with self._client.lock(f"{self._key(user_id)}:lock", timeout=timeout, blocking_timeout=timeout):
+            yield
+
+    def get(self, user_id):
+        raw = self._client.hgetall(self._key(user_id))
+        if not raw:
+            return None
+        raw.pop(b"__loaded__", None)
+        return {int(pid): json.loads(line) for pid, line in raw.items()}
+
+    def put(self, user_id, lines):
+        key = self._key(user_id)
+        pipe = self._client.pipeline()
+        pipe.delete(key)
+        # Marker field so an empty cart is still a cache hit
+        pipe.hset(key, mapping={"__loaded__": "1", **{str(pid): json.dumps(line) for pid, line in lines.items()}})
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def delete(self, user_id):
+        pipe = self._client.pipeline()
+        pipe.delete(self._key(user_id))
+        pipe.srem(f"{self._prefix}:dirty", user_id)
+        pipe.execute()
+
+    def mark_dirty(self, user_id):
+        self._client.sadd(f"{self._prefix}:dirty", user_id)
+
+    def pop_dirty(self):
+        return [int(uid) for uid in self._client.spop(f"{self._prefix}:dirty", 1000) or []]
+
+    def flushed(self, user_id):
+        # Keys outlive the flush interval by far; nothing to unpin
+        pass
+
+
+class CartStore:
+    """Flask extension exposing cart reads/mutations backed by a fast tier."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.backend = None
+        self.write_behind = True
+        self.flush_interval = 5
+        self.snapshot_ttl = 300
+        self._flusher_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        url = app.config.get("CART_STORE_URL", "memory://")
+        ttl = app.config.get("CART_STORE_TTL", 86400)
+        if url.startswith("redis"):
+            self.backend = RedisCartBackend(url, ttl=ttl)
+        else:
+            workers = app.config.get("WEB_CONCURRENCY", 1)
+            if workers > 1:
+                reason = f"with {workers} worker processes"
+            elif not app.config.get("CART_STORE_ALLOW_MEMORY", True):
+                reason = "in the production profile"
+            else:
+                reason = None
+            if reason:
+                raise RuntimeError(
+                    f"CART_STORE_URL={url} keeps a separate cart per worker process and is refused "
+                    f"{reason}; set CART_STORE_URL=redis://host:6379/0"
+                )
+            self.backend = MemoryCartBackend(app.config.get("CART_STORE_MAX_USERS", 10000), ttl)
+        self.write_behind = app.config.get("CART_WRITE_BEHIND", True)
+        self.flush_interval = app.config.get("CART_FLUSH_INTERVAL", 5)
+        self.snapshot_ttl = app.config.get("CART_SNAPSHOT_TTL", 300)
+        self.app = app
+        app.extensions["cart_store"] = self
+
+    # ── Reads ──
+
+    def _load(self, user_id):
+        from app.models.cart import Cart
+
+        rows = Cart.query.filter_by(user_id=user_id).all()
+        lines = {
+            row.product_id: {
+                "id": row.id,
+                "quantity": row.quantity,
+                "product": row.product.to_dict() if row.product else None,
+                "snapshot_at": time.time(),
+            }
+            for row in rows
+        }
+        self.backend.put(user_id, lines)
+        return lines
+
+    def _lines(self, user_id):
+        lines = self.backend.get(user_id)
+        if lines is None:
+            lines = self._load(user_id)
+        return lines
+
+    def get_cart(self, user_id):
+        """Return ``{product_id: line}`` for the user, refreshing stale product snapshots."""
+        lines = self._lines(user_id)
+        cutoff = time.time() - self.snapshot_ttl
+        stale = [pid for pid, line in lines.items() if line.get("snapshot_at", 0) < cutoff]
+        if stale:
+            from app.models.product import Product
+
+            with self.backend.lock(user_id):
+                lines = self._lines(user_id)
+                for product in Product.query.filter(Product.id.in_(stale)).all():
+                    if product.id in lines:
+                        lines[product.id]["product"] = product.to_dict()
+                        lines[product.id]["snapshot_at"] = time.time()
+                self.backend.put(user_id, lines)
+        return lines
+
+    def get_quantity(self, user_id, product_id):
+        line = self._lines(user_id).get(product_id)
+        return line["quantity"] if line else 0
+
+    # ── Mutations ──
+
+    def mutate(self, user_id, apply):
+        """Run ``apply(lines)`` under the user's cart lock and store the result.
+
+        ``apply`` edits the ``{product_id: line}`` dict in place; returning
+        ``False`` discards the edit.
+        """
+        with self.backend.lock(user_id):
+            lines = self._lines(user_id)
+            changed = apply(lines)
+            if changed is not False:
+                self.backend.put(user_id, lines)
+        if changed is not False:
+            self._changed(user_id)
+        return changed
+
+    @staticmethod
+    def set_line(lines, product, quantity):
+        if quantity <= 0:
+            lines.pop(product.id, None)
+            return
+        line = lines.get(product.id, {"id": None})
+        line.update({
+            "quantity": quantity,
+            "product": product.to_dict(),
+            "snapshot_at": time.time(),
+        })
+        lines[product.id] = line
+
+    def set_item(self, user_id, product, quantity):
+        """Set the quantity of ``product`` in the cart (0 removes it)."""
+        self.mutate(user_id, lambda lines: self.set_line(lines, product, quantity))
+
+    def add_item(self, user_id, product, quantity=1):
+        def apply(lines):
+            current = lines[product.id]["quantity"] if product.id in lines else 0
+            self.set_line(lines, product, current + quantity)
+        self.mutate(user_id, apply)
+
+    def remove_item(self, user_id, product_id):
+        return self.mutate(user_id, lambda lines: lines.pop(product_id, None) is not None)
+
+    def mark_ordered(self, user_id):
+        """Record that the cart was emptied in the database by checkout.
+
+        Call it inside ``checkout`` so the flusher cannot run in between.
+        """
+        self.backend.put(user_id, {})
+
+    def invalidate(self, user_id):
+        self.backend.delete(user_id)
+
+    def _changed(self, user_id):
+        if self.write_behind:
+            self.backend.mark_dirty(user_id)
+            self._ensure_flusher()
+        else:
+            self.flush(user_id)
+
+    # ── Persistence ──
+
+    def flush(self, user_id):
+        """Write the cached cart for ``user_id`` to the ``cart`` table and commit."""
+        with self.backend.lock(user_id):
+            self._flush(user_id)
+
+    @contextmanager
+    def checkout(self, user_id):
+        """Flush the cart and hold the user's cart lock until the block ends.
+
+        Cart edits and the background flusher wait for the checkout, so the
+        order sees exactly the flushed lines and nothing writes them back
+        after the block calls ``mark_ordered``.
+        """
+        with self.backend.lock(user_id, timeout=30):
+            self._flush(user_id)
+            yield
+
+    def _flush(self, user_id):
+        from app.extensions import db
+        from app.models.cart import Cart
+
+        lines = self.backend.get(user_id)
+        if lines is None:
+            self.backend.flushed(user_id)
+            return
+
+        rows = {row.product_id: row for row in Cart.query.filter_by(user_id=user_id).all()}
+        for product_id, row in rows.items():
+            if product_id not in lines:
+                db.session.delete(row)
+        for product_id, line in lines.items():
+            row = rows.get(product_id)
+            if row is None:
+                db.session.add(Cart(user_id=user_id, product_id=product_id, quantity=line["quantity"]))
+            elif row.quantity != line["quantity"]:
+                row.quantity = line["quantity"]
+        db.session.commit()
+        self.backend.flushed(user_id)
+
+    def flush_dirty(self):
+        """Persist every cart changed since the last flush; failed carts stay dirty."""
+        from app.extensions import db
+
+        flushed = 0
+        for user_id in self.backend.pop_dirty():
+            try:
+                self.flush(user_id)
+                flushed += 1
+            except Exception:
+                db.session.rollback()
+                self.backend.mark_dirty(user_id)
+                self.app.logger.exception("Cart flush failed for user %s", user_id)
+        return flushed
+
+    def _ensure_flusher(self):
+        # Started lazily per process so pre-forking servers get one flusher per worker
+        if self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        app = self.app
+
+        def flush_on_exit():
+            with app.app_context():
+                self.flush_dirty()
+
+        def run():
+            while True:
+                time.sleep(self.flush_interval)
+                with app.app_context():
+                    self.flush_dirty()
+
+        threading.Thread(target=run, name="cart-flusher", daemon=True).start()
+        atexit.register(flush_on_exit)
@@ -0,0 +1,143 @@
+import math
+
+from sqlalchemy import case, or_, select
+from sqlalchemy.orm import selectinload
+
+from app.models.category import Category
+from app.models.product import Product
+
+
+class CatalogService:
+    """Catalog read queries as ``select()`` statements.
+
+    Used by the Flask catalog routes and by the async catalog app, so both
+    filter, sort and paginate the same way.
+    """
+
+    @staticmethod
+    def arg(args, name, type_, default=None):
+        """``args.get(name, type=...)`` for any mapping (Flask or Starlette query params)."""
+        value = args.get(name)
+        if value is None or value == "":
+            return default
+        try:
+            return type_(value)
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def parse_product_filters(args):
+        return {
+            "search": (args.get("search") or "").strip(),
+            "min_price": CatalogService.arg(args, "min_price", float),
+            "max_price": CatalogService.arg(args, "max_price", float),
+            "category_id": CatalogService.arg(args, "category_id", int),
+            "brand": (args.get("brand") or "").strip(),
+            "featured": (args.get("featured") or "").lower() == "true",
+            "min_discount": CatalogService.arg(args, "min_discount", int),
+        }
+
+    @staticmethod
+    def parse_page(args, default_per_page=12):
+        """Page arguments, normalized the way ``paginate(error_out=False)`` does."""
+        page = CatalogService.arg(args, "page", int, 1)
+        per_page = CatalogService.arg(args, "per_page", int, default_per_page)
+        return max(page, 1), per_page if per_page > 0 else 20
+
+    @staticmethod
+    def filter_products(stmt, filters):
+        stmt = stmt.where(Product.is_active == True)
+        search = filters.get("search")
+        if search:
+            stmt = stmt.where(or_(
+                Product.name.ilike(f"%{search}%"),
+                Product.description.ilike(f"%{search}%"),
+                Product.brand.ilike(f"%{search}%"),
+            ))
+        if filters.get("category_id"):
+            stmt = stmt.where(Product.category_id == filters["category_id"])
+        if filters.get("brand"):
+            stmt = stmt.where(Product.brand.ilike(f"%{filters['brand']}%"))
+        if filters.get("min_price") is not None:
+            stmt = stmt.where(Product.price >= filters["min_price"])
+        if filters.get("max_price") is not None:
+            stmt = stmt.where(Product.price <= filters["max_price"])
+        if filters.get("featured"):
+            stmt = stmt.where(Product.is_featured == True)
+        if filters.get("min_discount"):
+            stmt = stmt.where(Product.discount_percent >= filters["min_discount"])
+        return stmt
+
+    @staticmethod
+    def sort_products(stmt, sort, search=None):
+        if sort == "relevance" and search:
+            # Name matches first, then brand, then description-only matches;
+            # popularity orders products within each group
+            match = case(
+                (Product.name.ilike(f"{search}%"), 3),
+                (Product.name.ilike(f"%{search}%"), 2),
+                (Product.brand.ilike(f"%{search}%"), 1),
+                else_=0,
+            )
+            return stmt.order_by(match.desc(), Product.popularity_score.desc(), Product.id.desc())
+        if sort == "price_low":
+            return stmt.order_by(Product.price.asc())
+        if sort == "price_high":
+            return stmt.order_by(Product.price.desc())
+        if sort == "name":
+            return stmt.order_by(Product.name.asc())
+        if sort == "discount":
+            return stmt.order_by(Product.discount_percent.desc(), Product.id.desc())
+        if sort == "popular":
+            return stmt.order_by(Product.popularity_score.desc(), Product.id.desc())
+        return stmt.order_by(Product.created_at.desc())
+
+    @staticmethod
+    def product_list(args):
+        """Filtered, sorted product statement for ``GET /api/products``."""
+        filters = CatalogService.parse_product_filters(args)
+        stmt = select(Product).options(selectinload(Product.category))
+        stmt = CatalogService.filter_products(stmt, filters)
+        default_sort = "relevance" if filters["search"] else "newest"
+        return CatalogService.sort_products(stmt, args.get("sort") or default_sort, filters["search"])
+
+    @staticmethod
+    def category_products(category_id, sort):
+        stmt = select(Product).options(selectinload(Product.category))
+        stmt = CatalogService.filter_products(stmt, {"category_id": category_id})
+        return CatalogService.sort_products(stmt, sort or "newest")
+
+    @staticmethod
+    def featured(limit):
+        return select(Product).options(selectinload(Product.category))\
+            .where(Product.is_featured == True, Product.is_active == True)\
+            .order_by(Product.created_at.desc()).limit(limit)
+
+    @staticmethod
+    def deals(limit, sort=None, min_discount=None):
+        stmt = select(Product).options(selectinload(Product.category)).where(Product.is_active == True)
+        if min_discount and min_discount > 0:
+            stmt = stmt.where(Product.discount_percent >= min_discount)
+        else:
+            # Any markdown at all: a rounded percent of 0 would drop sub-0.5% discounts
+            stmt = stmt.where(Product.discount_amount > 0)
+        return CatalogService.sort_products(stmt, sort or "newest").limit(limit)
+
+    @staticmethod
+    def brands():
+        return select(Product.brand)\
+            .where(Product.brand.isnot(None), Product.brand != "", Product.is_active == True)\
+            .distinct().order_by(Product.brand)
+
+    @staticmethod
+    def top_categories():
+        return select(Category).where(Category.parent_id.is_(None)).order_by(Category.name)
+
+    @staticmethod
+    def page_payload(items, total, page, per_page):
+        return {
+            "products": [p.to_dict() for p in items],
+            "total": total,
+            "pages": math.ceil(total / per_page) if total else 0,
+            "current_page": page,
+        }
@@ -0,0 +1,144 @@
+"""Response compression.
+
+JSON and text responses of at least ``COMPRESS_MIN_SIZE`` bytes are encoded
+with brotli or gzip, whichever the client's ``Accept-Encoding`` prefers
+(brotli wins ties; it is skipped when the ``brotli`` package is missing).
+
+Compressed bodies are kept in an LRU keyed by a digest of the uncompressed
+bytes and the encoding, bounded by ``COMPRESS_CACHE_BYTES``. Each entry is
+charged its compressed size plus ``ENTRY_OVERHEAD`` for the key and
+bookkeeping, so bodies that don't shrink (cached as an empty marker) still
+count against the bound. Hot endpoints
+that return the same payload (catalog pages, featured products) are
+compressed once and then served from the cache; hashing a body is far cheaper
+than compressing it again.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = {"application/json", "text/html", "text/plain", "text/css", "text/csv", "application/javascript"}
+
+
+def parse_accept_encoding(header):
+    """Return ``{coding: quality}`` from an ``Accept-Encoding`` header."""
+    qualities = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities
+
+
+class Compressor:
+
+    # Approximate bytes per cache entry besides the data: the (digest,
+    # encoding) key, the bytes objects' headers and the OrderedDict node
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_level = 5
+        self.cache_bytes = 32 * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.configure(app.config)
+        app.extensions["compressor"] = self
+        if self.enabled:
+            app.after_request(self._compress_response)
+
+    def configure(self, config):
+        """Read ``COMPRESS_*`` settings from a config mapping."""
+        self.enabled = config.get("COMPRESS_ENABLED", True)
+        self.min_size = config.get("COMPRESS_MIN_SIZE", 1024)
+        self.gzip_level = config.get("COMPRESS_GZIP_LEVEL", 6)
+        self.brotli_level = config.get("COMPRESS_BROTLI_LEVEL", 5)
+        self.cache_bytes = config.get("COMPRESS_CACHE_BYTES", 32 * 1024 * 1024)
+
+    def choose_encoding(self, accept_encoding):
+        qualities = parse_accept_encoding(accept_encoding)
+        wildcard = qualities.get("*", 0.0)
+        candidates = []
+        if brotli is not None:
+            candidates.append(("br", qualities.get("br", wildcard)))
+        candidates.append(("gzip", qualities.get("gzip", wildcard)))
+        encoding, quality = max(candidates, key=lambda c: c[1])
+        return encoding if quality > 0 else None
+
+    def _encode(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_level)
+        # mtime=0 keeps output identical for identical input
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compress(self, body, accept_encoding):
+        """Return ``(encoding, data)``; encoding is None when ``body`` is sent as is."""
+        if len(body) < self.min_size:
+            return None, body
+        encoding = self.choose_encoding(accept_encoding)
+        if encoding is None:
+            return None, body
+
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                # b"" records a body that doesn't shrink when compressed
+                return (encoding, data) if data else (None, body)
+
+        data = self._encode(body, encoding)
+        if len(data) >= len(body):
+            data = b""
+        with self._lock:
+            self.misses += 1
+            size = len(data) + self.ENTRY_OVERHEAD
+            if key not in self._cache and size <= self.cache_bytes:
+                self._cache[key] = data
+                self._cached_bytes += size
+                while self._cached_bytes > self.cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted) + self.ENTRY_OVERHEAD
+        return (encoding, data) if data else (None, body)
+
+    def _compress_response(self, response):
+        from flask import request
+
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES
+                or "no-transform" in response.headers.get("Cache-Control", "")):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding, data = self.compress(response.get_data(), request.headers.get("Accept-Encoding"))
+        if encoding:
+            response.set_data(data)
+            response.headers["Content-Encoding"] = encoding
+        return response
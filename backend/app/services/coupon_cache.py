@@ -0,0 +1,142 @@
+"""In-process cache of active coupons.
+
+Holds every active, unexpired coupon as column arrays so pricing can look codes
+up, and rank coupons against a cart, without a query. The cache is reloaded
+lazily after any coupon is inserted, deleted or edited in this process (it is
+dropped when the change is flushed and again after the transaction commits,
+so a reload in between can't keep pre-commit rows), and at most every
+``COUPON_CACHE_TTL`` seconds otherwise so changes made by other workers are
+picked up. ``times_used`` increments alone do not invalidate it; checkout
+re-reads the coupon row before redeeming it, so a stale usage count can only
+make a quote optimistic, never an order.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+_DIRTY_KEY = "coupon_cache_dirty"
+
+
+class CouponTable:
+    """Column arrays over the cached coupon rows.
+
+    Built straight from row tuples so tens of thousands of coupons load without
+    creating ORM objects; ``coupon(i)`` materializes a transient ``Coupon`` for
+    a single row when its methods are needed.
+    """
+
+    def __init__(self, columns, rows):
+        import numpy as np  # deferred: keeps numpy out of worker start-up
+
+        from app.models.coupon import Coupon
+
+        self._model = Coupon
+        self._columns = columns
+        self.rows = rows
+        self.codes = [row.code for row in rows]
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.is_percent = np.array([row.discount_type == "percent" for row in rows], dtype=bool)
+        self.discount_value = np.array([row.discount_value for row in rows], dtype=np.float64)
+        self.min_order = np.array([row.min_order_amount or 0 for row in rows], dtype=np.float64)
+        # 0 means "no cap" / "no limit", matching the truthiness checks on Coupon
+        self.max_discount = np.array([row.max_discount or 0 for row in rows], dtype=np.float64)
+        self.usage_limit = np.array([row.usage_limit or 0 for row in rows], dtype=np.int64)
+        self.times_used = np.array([row.times_used or 0 for row in rows], dtype=np.int64)
+        self.expires_at = np.array(
+            [_utc_timestamp(row.expires_at) for row in rows], dtype=np.float64,
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def coupon(self, i):
+        # Transient copy: usable with Coupon methods, never attached to a session
+        return self._model(**dict(zip(self._columns, self.rows[i])))
+
+
+def _utc_timestamp(value):
+    if value is None:
+        return float("inf")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class CouponCache:
+
+    def __init__(self, app=None):
+        self.ttl = 60
+        self._table = None
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("COUPON_CACHE_TTL", 60)
+        app.extensions["coupon_cache"] = self
+        if not self._listening:
+            from app.models.coupon import Coupon
+
+            event.listen(Coupon, "after_insert", self._on_write)
+            event.listen(Coupon, "after_delete", self._on_write)
+            event.listen(Coupon, "after_update", self._on_update)
+            event.listen(Session, "after_commit", self._after_commit)
+            self._listening = True
+
+    def _on_write(self, mapper, connection, target):
+        self.invalidate()
+        session = Session.object_session(target)
+        if session is not None:
+            session.info[_DIRTY_KEY] = True
+
+    def _on_update(self, mapper, connection, target):
+        state = inspect(target)
+        changed = [attr.key for attr in state.attrs if attr.history.has_changes()]
+        if any(key != "times_used" for key in changed):
+            self._on_write(mapper, connection, target)
+
+    def _after_commit(self, session):
+        if session.info.pop(_DIRTY_KEY, False):
+            self.invalidate()
+
+    def invalidate(self):
+        self._table = None
+
+    def _load(self):
+        from app.extensions import db
+        from app.models.coupon import Coupon
+
+        columns = [c.key for c in Coupon.__table__.columns]
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        rows = db.session.query(*[getattr(Coupon, c) for c in columns]).filter(
+            Coupon.is_active == True,
+            db.or_(Coupon.expires_at == None, Coupon.expires_at > now),
+            db.or_(Coupon.usage_limit == None, Coupon.usage_limit == 0,
+                   Coupon.times_used < Coupon.usage_limit),
+        ).all()
+        return CouponTable(columns, rows)
+
+    def table(self):
+        """Return the active coupons as a ``CouponTable`` for vectorized evaluation."""
+        table = self._table
+        if table is None or time.time() - self._loaded_at > self.ttl:
+            with self._lock:
+                table = self._table
+                if table is None or time.time() - self._loaded_at > self.ttl:
+                    table = self._load()
+                    self._table = table
+                    self._loaded_at = time.time()
+        return table
+
+    def get(self, code):
+        """Return a transient ``Coupon`` for an active code, or None."""
+        if not code:
+            return None
+        table = self.table()
+        i = table.index.get(code.upper().strip())
+        return None if i is None else table.coupon(i)
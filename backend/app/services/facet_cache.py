@@ -0,0 +1,223 @@
+"""In-process product facet counts.
+
+``GET /api/products/facets`` answers "how many products match per brand,
+category, price bucket, stock status and rating band" for the current
+filters. Instead of a GROUP BY per facet per keystroke, every active product
+is held as column arrays (codes for brand and category, price, stock status
+code, average rating) and each request is a handful of boolean masks plus
+``bincount``/``histogram`` calls over them.
+
+Counts are disjunctive: each facet is counted with every filter applied
+except its own, so picking a brand still shows how many products the other
+brands have.
+
+The snapshot is rebuilt lazily after products or reviews are written in this
+process (it is dropped when the change is flushed and again after the
+transaction commits, so a rebuild in between can't keep pre-commit rows),
+and at most every ``FACET_CACHE_TTL`` seconds otherwise. Stock and
+popularity changes alone do not invalidate it (checkout decrements stock on
+every order); stock status counts may lag by up to the TTL.
+"""
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+STOCK_STATUSES = ("in_stock", "low_stock", "out_of_stock")
+# Product attributes whose changes don't invalidate the snapshot
+VOLATILE_FIELDS = {"stock", "popularity_score", "updated_at"}
+_DIRTY_KEY = "facet_cache_dirty"
+
+
+class ProductFacetTable:
+    """Column arrays over every active product."""
+
+    def __init__(self, rows, category_names, ratings):
+        import numpy as np  # deferred: keeps numpy out of worker start-up
+
+        self.ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.price = np.array([row.price for row in rows], dtype=np.float64)
+        self.featured = np.array([bool(row.is_featured) for row in rows], dtype=bool)
+        self.discount = np.array([row.discount_percent or 0 for row in rows], dtype=np.int64)
+        self.category_id = np.array([row.category_id or 0 for row in rows], dtype=np.int64)
+        self.category_names = category_names
+
+        brands = [row.brand or "" for row in rows]
+        self.brands, self.brand_code = np.unique(np.array(brands, dtype=object), return_inverse=True)
+        self.brand_code = self.brand_code.astype(np.int64)
+        self.categories, self.category_code = np.unique(self.category_id, return_inverse=True)
+        self.category_code = self.category_code.astype(np.int64)
+
+        stock = np.array([row.stock or 0 for row in rows], dtype=np.int64)
+        # Same thresholds as Product.stock_status
+        self.stock_code = np.where(stock == 0, 2, np.where(stock < 10, 1, 0))
+        self.rating = np.array([ratings.get(row.id, np.nan) for row in rows], dtype=np.float64)
+
+        # Lowercased text for the substring filters the SQL query does with ILIKE
+        self.brand_text = [brand.lower() for brand in brands]
+        self.search_text = [
+            "\n".join((row.name or "", row.description or "", row.brand or "")).lower() for row in rows
+        ]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _contains(self, texts, needle):
+        import numpy as np
+
+        needle = needle.lower()
+        return np.fromiter((needle in text for text in texts), dtype=bool, count=len(texts))
+
+    def masks(self, filters):
+        """Boolean mask per filter name, for the filters that are set."""
+        masks = {}
+        if filters.get("search"):
+            masks["search"] = self._contains(self.search_text, filters["search"])
+        if filters.get("brand"):
+            masks["brand"] = self._contains(self.brand_text, filters["brand"])
+        if filters.get("category_id"):
+            masks["category"] = self.category_id == filters["category_id"]
+        if filters.get("min_price") is not None or filters.get("max_price") is not None:
+            low = filters.get("min_price")
+            high = filters.get("max_price")
+            masks["price"] = ((self.price >= low) if low is not None else True) & \
+                             ((self.price <= high) if high is not None else True)
+        if filters.get("featured"):
+            masks["featured"] = self.featured
+        if filters.get("min_discount"):
+            masks["discount"] = self.discount >= filters["min_discount"]
+        return masks
+
+    def _combined(self, masks, skip=None):
+        import numpy as np
+
+        mask = np.ones(len(self), dtype=bool)
+        for name, values in masks.items():
+            if name != skip:
+                mask &= values
+        return mask
+
+    def facets(self, filters, price_edges):
+        import numpy as np
+
+        masks = self.masks(filters)
+        matched = self._combined(masks)
+
+        brand_counts = np.bincount(self.brand_code[self._combined(masks, "brand")], minlength=len(self.brands))
+        category_counts = np.bincount(self.category_code[self._combined(masks, "category")],
+                                      minlength=len(self.categories))
+        price_counts, _ = np.histogram(self.price[self._combined(masks, "price")], bins=price_edges)
+        stock_counts = np.bincount(self.stock_code[matched], minlength=len(STOCK_STATUSES))
+
+        ratings = self.rating[matched]
+        rated = ratings[~np.isnan(ratings)]
+        # Bands [1, 2), [2, 3), [3, 4), [4, 5]
+        rating_counts, _ = np.histogram(rated, bins=[1, 2, 3, 4, 5])
+
+        return {
+            "total": int(matched.sum()),
+            "brands": sorted(
+                ({"brand": str(self.brands[i]), "count": int(n)}
+                 for i, n in enumerate(brand_counts) if n and self.brands[i]),
+                key=lambda item: (-item["count"], item["brand"]),
+            ),
+            "categories": sorted(
+                ({"id": int(self.categories[i]), "name": self.category_names.get(int(self.categories[i])),
+                  "count": int(n)}
+                 for i, n in enumerate(category_counts) if n and self.categories[i]),
+                key=lambda item: (-item["count"], item["name"] or ""),
+            ),
+            "price": [
+                {"min": float(price_edges[i]),
+                 "max": float(price_edges[i + 1]) if np.isfinite(price_edges[i + 1]) else None,
+                 "count": int(n)}
+                for i, n in enumerate(price_counts)
+            ],
+            "stock_status": {status: int(n) for status, n in zip(STOCK_STATUSES, stock_counts)},
+            "rating": [
+                {"min": band, "max": band + 1, "count": int(n)}
+                for band, n in reversed(list(zip(range(1, 5), rating_counts)))
+            ] + [{"min": None, "max": None, "count": int(len(ratings) - len(rated))}],
+        }
+
+
+class FacetCache:
+
+    PRICE_EDGES = (0, 25, 50, 100, 250, 500, 1000, float("inf"))
+
+    def __init__(self, app=None):
+        self.ttl = 60
+        self._table = None
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("FACET_CACHE_TTL", 60)
+        app.extensions["facet_cache"] = self
+        if not self._listening:
+            from app.models.product import Product
+            from app.models.review import Review
+
+            for model in (Product, Review):
+                event.listen(model, "after_insert", self._on_write)
+                event.listen(model, "after_delete", self._on_write)
+            event.listen(Product, "after_update", self._on_product_update)
+            event.listen(Review, "after_update", self._on_write)
+            event.listen(Session, "after_commit", self._after_commit)
+            self._listening = True
+
+    def _on_write(self, mapper, connection, target):
+        self.invalidate()
+        session = Session.object_session(target)
+        if session is not None:
+            session.info[_DIRTY_KEY] = True
+
+    def _on_product_update(self, mapper, connection, target):
+        state = inspect(target)
+        changed = [attr.key for attr in state.attrs if attr.history.has_changes()]
+        if any(key not in VOLATILE_FIELDS for key in changed):
+            self._on_write(mapper, connection, target)
+
+    def _after_commit(self, session):
+        if session.info.pop(_DIRTY_KEY, False):
+            self.invalidate()
+
+    def invalidate(self):
+        self._table = None
+
+    def _load(self):
+        from app.extensions import db
+        from app.models.category import Category
+        from app.models.product import Product
+        from app.models.review import Review
+
+        rows = db.session.query(
+            Product.id, Product.name, Product.description, Product.brand, Product.price,
+            Product.stock, Product.is_featured, Product.category_id, Product.discount_percent,
+        ).filter(Product.is_active == True).all()
+        category_names = dict(db.session.query(Category.id, Category.name).all())
+        ratings = dict(db.session.query(Review.product_id, db.func.avg(Review.rating))
+                       .group_by(Review.product_id).all())
+        return ProductFacetTable(rows, category_names, {k: float(v) for k, v in ratings.items()})
+
+    def table(self):
+        """Return the active products as a ``ProductFacetTable``."""
+        table = self._table
+        if table is None or time.time() - self._loaded_at > self.ttl:
+            with self._lock:
+                table = self._table
+                if table is None or time.time() - self._loaded_at > self.ttl:
+                    table = self._load()
+                    self._table = table
+                    self._loaded_at = time.time()
+        return table
+
+    def facets(self, filters):
+        """Facet counts for ``CatalogService.parse_product_filters`` output."""
+        import numpy as np
+
+        return self.table().facets(filters, np.array(self.PRICE_EDGES, dtype=np.float64))
@@ -1,17 +1,39 @@
-from app.extensions import db
+from app.extensions import db, cart_store
 from app.models.cart import Cart
 from app.models.product import Product
-from app.models.order import Order, OrderItem
+from app.models.order import Order, OrderItem, OrderStatusHistory
 from app.models.coupon import Coupon
 from app.models.address import Address
+from app.services.pricing_service import PricingService
+from app.services.purchase_index import PurchaseIndex
 import json
 
 
 class OrderService:
 
+    VALID_STATUSES = ("PLACED", "PROCESSING", "SHIPPED", "DELIVERED", "CANCELLED")
+
+    # Allowed moves out of each status; DELIVERED and CANCELLED are terminal.
+    STATUS_TRANSITIONS = {
+        "PLACED": ("PROCESSING", "SHIPPED", "CANCELLED"),
+        "PROCESSING": ("SHIPPED", "CANCELLED"),
+        "SHIPPED": ("DELIVERED",),
+        "DELIVERED": (),
+        "CANCELLED": (),
+    }
+
+    MAX_BULK_ORDERS = 5000
+
     @staticmethod
     def place_order(user_id, address_id=None, coupon_code=None, payment_method="COD"):
         """Place an order from user's cart with stock validation, address, and coupon support."""
+        # The cart lock is held until the cart is cleared, so neither the
+        # write-behind flusher nor a concurrent cart edit can interleave
+        with cart_store.checkout(user_id):
+            return OrderService._place_order_from_cart(user_id, address_id, coupon_code, payment_method)
+
+    @staticmethod
+    def _place_order_from_cart(user_id, address_id, coupon_code, payment_method):
         cart_items = Cart.query.filter_by(user_id=user_id).all()
         if not cart_items:
             return None, "Cart is empty"
@@ -28,61 +50,52 @@ class OrderService:
             if default_addr:
                 shipping_address_json = json.dumps(default_addr.to_dict())
 
-        subtotal = 0
-        order_items = []
-
-        # Validate all items and calculate subtotal
-        for item in cart_items:
-            product = Product.query.get(item.product_id)
-            if not product:
-                return None, f"Product ID {item.product_id} not found"
-            if not product.is_available:
-                return None, f"'{product.name}' is out of stock"
-            if product.stock < item.quantity:
-                return None, f"Insufficient stock for '{product.name}'. Only {product.stock} available"
-
-            if product.price <= 0:
-                return None, f"Invalid price for '{product.name}'"
+        coupon = None
+        if coupon_code:
+            coupon = Coupon.query.filter_by(code=coupon_code.upper()).with_for_update().first()
+            if not coupon or not coupon.is_valid:
+                return None, "Invalid or expired coupon"
 
-            line_total = product.price * item.quantity
-            subtotal += line_total
+        # Cart.product is eagerly joined, so pricing needs no further queries
+        quote = PricingService.price_items(
+            ((item.product_id, item.product, item.quantity) for item in cart_items),
+            coupon=coupon,
+        )
+        if quote["errors"]:
+            return None, quote["errors"][0]
 
+        order_items = []
+        for item in cart_items:
             order_items.append(
                 OrderItem(
-                    product_id=product.id,
+                    product_id=item.product_id,
                     quantity=item.quantity,
-                    price=product.price,
+                    price=item.product.price,
                 )
             )
-            product.stock -= item.quantity
-
-        # Apply coupon if provided
-        discount_amount = 0
-        if coupon_code:
-            coupon = Coupon.query.filter_by(code=coupon_code.upper()).first()
-            if coupon and coupon.is_valid:
-                discount_amount = coupon.calculate_discount(subtotal)
-                coupon.times_used += 1
-            else:
-                return None, "Invalid or expired coupon"
+            item.product.stock -= item.quantity
 
-        total_price = round(max(0, subtotal - discount_amount), 2)
+        if coupon:
+            coupon.times_used += 1
 
         order = Order(
             user_id=user_id,
-            subtotal=round(subtotal, 2),
-            total_price=total_price,
-            discount_amount=round(discount_amount, 2),
+            subtotal=quote["subtotal"],
+            total_price=quote["total"],
+            discount_amount=quote["discount"],
             coupon_code=coupon_code.upper() if coupon_code else None,
             shipping_address=shipping_address_json,
             payment_method=payment_method,
             status="PLACED",
         )
         order.items = order_items
+        order.status_history.append(OrderStatusHistory(to_status="PLACED", changed_by=user_id))
         db.session.add(order)
+        PurchaseIndex.record_order(user_id, [item.product_id for item in cart_items])
 
         Cart.query.filter_by(user_id=user_id).delete()
         db.session.commit()
+        cart_store.mark_ordered(user_id)
 
         return order, None
 
@@ -101,15 +114,127 @@ class OrderService:
         return order, None
 
     @staticmethod
-    def update_status(order_id, status):
-        valid_statuses = ("PLACED", "PROCESSING", "SHIPPED", "DELIVERED", "CANCELLED")
-        if status not in valid_statuses:
-            return None, f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+    def can_transition(current, target):
+        return target in OrderService.STATUS_TRANSITIONS.get(current, ())
 
-        order = Order.query.get(order_id)
+    @staticmethod
+    def _check_status(status):
+        if status not in OrderService.VALID_STATUSES:
+            return f"Invalid status. Must be one of: {', '.join(OrderService.VALID_STATUSES)}"
+        return None
+
+    @staticmethod
+    def _restore_stock(order_ids):
+        """Put the quantities of the given orders back on the shelf with one UPDATE per product."""
+        rows = db.session.query(OrderItem.product_id, db.func.sum(OrderItem.quantity))\
+            .filter(OrderItem.order_id.in_(order_ids))\
+            .group_by(OrderItem.product_id).all()
+        if not rows:
+            return
+        products = Product.__table__
+        db.session.execute(
+            products.update()
+            .where(products.c.id == db.bindparam("pid"))
+            .values(stock=products.c.stock + db.bindparam("qty")),
+            [{"pid": product_id, "qty": int(qty)} for product_id, qty in rows],
+        )
+
+    @staticmethod
+    def update_status(order_id, status, changed_by=None, note=None):
+        error = OrderService._check_status(status)
+        if error:
+            return None, error
+
+        # Lock the row like bulk_update_status does, so two concurrent cancels
+        # cannot both pass the transition check and restore stock twice
+        order = Order.query.options(db.lazyload("*")).filter_by(id=order_id)\
+            .with_for_update().populate_existing().one_or_none()
         if not order:
             return None, "Order not found"
 
+        if not OrderService.can_transition(order.status, status):
+            return None, f"Cannot change status from {order.status} to {status}"
+
+        if status == "CANCELLED":
+            OrderService._restore_stock([order.id])
+            PurchaseIndex.release_orders([order.id])
+            db.session.expire_all()
+
+        db.session.add(OrderStatusHistory(
+            order_id=order.id,
+            from_status=order.status,
+            to_status=status,
+            changed_by=changed_by,
+            note=note,
+        ))
         order.status = status
         db.session.commit()
         return order, None
+
+    @staticmethod
+    def bulk_update_status(order_ids, status, changed_by=None, note=None):
+        """Move many orders to ``status`` in one transaction.
+
+        Rows are locked and validated together, then updated with one UPDATE per
+        source status. Returns a list of per-id results in request order.
+        """
+        error = OrderService._check_status(status)
+        if error:
+            return None, error
+        if len(order_ids) > OrderService.MAX_BULK_ORDERS:
+            return None, f"At most {OrderService.MAX_BULK_ORDERS} orders can be updated at once"
+
+        current = dict(
+            db.session.query(Order.id, Order.status)
+            .filter(Order.id.in_(order_ids))
+            .with_for_update()
+            .all()
+        )
+
+        results = []
+        by_source = {}
+        seen = set()
+        for order_id in order_ids:
+            if order_id in seen:
+                continue
+            seen.add(order_id)
+            if order_id not in current:
+                results.append({"order_id": order_id, "success": False, "error": "Order not found"})
+                continue
+            from_status = current[order_id]
+            if not OrderService.can_transition(from_status, status):
+                results.append({
+                    "order_id": order_id,
+                    "success": False,
+                    "error": f"Cannot change status from {from_status} to {status}",
+                })
+                continue
+            by_source.setdefault(from_status, []).append(order_id)
+            results.append({"order_id": order_id, "success": True,
+                            "from_status": from_status, "status": status})
+
+        if by_source:
+            moved = [oid for ids in by_source.values() for oid in ids]
+            if status == "CANCELLED":
+                OrderService._restore_stock(moved)
+                PurchaseIndex.release_orders(moved)
+
+            for from_status, ids in by_source.items():
+                Order.query.filter(Order.id.in_(ids), Order.status == from_status)\
+                    .update({"status": status}, synchronize_session=False)
+
+            db.session.execute(
+                db.insert(OrderStatusHistory),
+                [
+                    {"order_id": oid, "from_status": from_status, "to_status": status,
+                     "changed_by": changed_by, "note": note}
+                    for from_status, ids in by_source.items() for oid in ids
+                ],
+            )
+        db.session.commit()
+        return results, None
+
+    @staticmethod
+    def get_status_history(order_id):
+        return OrderStatusHistory.query.filter_by(order_id=order_id)\
+            .order_by(OrderStatusHistory.created_at.asc(), OrderStatusHistory.id.asc()).all()
@@ -0,0 +1,128 @@
+"""Bounded bcrypt worker pool.
+
+bcrypt is deliberately CPU-heavy. Running it on request threads lets a login
+burst occupy every worker and stall unrelated traffic, so hashing and
+verification run on a small thread pool (bcrypt releases the GIL) with a cap
+on queued jobs. When the cap is reached callers get ``PasswordHasherBusy``,
+which the app turns into a fast 503 instead of an ever-growing queue.
+
+The caller still waits for its job, so with sync (and gthread) workers the
+request thread is blocked just as before: the pool caps how many hashes run
+at once per process, it does not free the worker. ``BCRYPT_TIMEOUT`` bounds
+the wait in the queue; a job that has started is always waited for, and a
+job whose caller gave up is skipped when its turn comes.
+
+Under gevent (``GUNICORN_WORKER_CLASS=gevent``) the standard thread pool would
+run bcrypt on greenlets and block the event loop, so gevent's native
+``ThreadPoolExecutor`` is used instead: jobs run on OS threads while the
+waiting request yields to other greenlets.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flask import jsonify
+
+
+def _executor_class():
+    """A ``ThreadPoolExecutor`` that runs jobs on OS threads, even under gevent."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return ThreadPoolExecutor
+    if monkey.is_module_patched("threading"):
+        from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+        return NativeThreadPoolExecutor
+    return ThreadPoolExecutor
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool and its queue are full."""
+
+
+class PasswordHasher:
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.timeout = 10
+        self.retry_after = 1
+        self.pool_size = 1
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.extensions import bcrypt
+
+        self._bcrypt = bcrypt
+        self.rounds = app.config.get("BCRYPT_LOG_ROUNDS", 12)
+        self.timeout = app.config.get("BCRYPT_TIMEOUT", 10)
+        self.retry_after = app.config.get("BCRYPT_RETRY_AFTER", 1)
+        self.pool_size = app.config.get("BCRYPT_POOL_SIZE") or max(1, (os.cpu_count() or 2) // 2)
+        queue_depth = app.config.get("BCRYPT_QUEUE_DEPTH", self.pool_size * 4)
+        # Running plus waiting jobs; acquiring never blocks
+        self._slots = threading.BoundedSemaphore(self.pool_size + queue_depth)
+
+        app.extensions["password_hasher"] = self
+        app.register_error_handler(PasswordHasherBusy, self._busy_response)
+
+    def _busy_response(self, error):
+        response = jsonify({"error": "Server is busy, please retry shortly"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(self.retry_after)
+        return response
+
+    def _pool(self):
+        # Built lazily in each process: a pool created in the gunicorn master
+        # before forking has no working threads in the workers
+        with self._executor_lock:
+            if self._executor_pid != os.getpid():
+                self._executor = _executor_class()(max_workers=self.pool_size, thread_name_prefix="bcrypt")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        # Whichever of the job and a timed-out caller pops this first decides
+        # whether the job runs; list.pop is atomic, also across native threads
+        claim = [True]
+
+        def job():
+            try:
+                claim.pop()
+            except IndexError:
+                return None     # the caller gave up while it was queued
+            return fn(*args)
+
+        try:
+            future = self._pool().submit(job)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            try:
+                claim.pop()
+            except IndexError:
+                # Already running: finish it rather than fail with the slot still busy
+                return future.result()
+            raise PasswordHasherBusy()
+
+    def hash(self, password):
+        return self._run(self._bcrypt.generate_password_hash, password, self.rounds).decode("utf-8")
+
+    def verify(self, password_hash, password):
+        return self._run(self._bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when ``password_hash`` was made with a different cost than configured."""
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError, AttributeError):
+            return True
@@ -0,0 +1,180 @@
+"""Connection pool telemetry.
+
+Listens to the public pool events on every engine (primary and replica binds)
+and keeps per-process counters: checkouts, new connections, invalidations,
+connections in use and overflow (current and peak), plus a window of recent
+checkout wait times.
+
+A wait is the time from a session starting a transaction to that transaction
+getting its first connection (``after_transaction_create`` to
+``after_begin``). In between the session does nothing but ask the pool, so
+this covers time queued for a free connection as well as opening a new one
+when the pool is below its size. Checkout timeouts are counted when a pool
+``TimeoutError`` escapes a request; they are reported per process, since
+the error does not say which bind raised it.
+
+Every gunicorn worker has its own pools and its own numbers; scrape
+``/api/health/metrics`` on each worker (the response includes the pid) and
+add them up when sizing pools against MySQL's ``max_connections``.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+_WAIT_KEY = "pool_wait_started"
+
+
+class PoolStats:
+
+    def __init__(self, window, slow_seconds):
+        self.slow_seconds = slow_seconds
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidated = 0
+        self.slow_checkouts = 0
+        self.peak_in_use = 0
+        self.peak_overflow = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waits = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record_connect(self):
+        with self.lock:
+            self.connects += 1
+
+    def record_invalidate(self):
+        with self.lock:
+            self.invalidated += 1
+
+    def record_wait(self, seconds):
+        with self.lock:
+            self.waits.append(seconds)
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if seconds >= self.slow_seconds:
+                self.slow_checkouts += 1
+
+    def record_checkout(self, pool):
+        with self.lock:
+            self.checkouts += 1
+            if isinstance(pool, QueuePool):
+                self.peak_in_use = max(self.peak_in_use, pool.checkedout())
+                self.peak_overflow = max(self.peak_overflow, pool.overflow())
+
+
+class PoolMetrics:
+
+    WAIT_WINDOW = 1000
+
+    def __init__(self, app=None):
+        self._stats = {}
+        self._engines = {}
+        self.slow_seconds = 0.05
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Instrument the app's engines; call after ``db.init_app`` (no I/O happens here)."""
+        from flask import got_request_exception
+
+        from app.extensions import db
+
+        self.slow_seconds = app.config.get("DB_POOL_SLOW_CHECKOUT_MS", 50) / 1000
+        with app.app_context():
+            engines = dict(db.engines)
+        for bind_key, engine in engines.items():
+            self._watch(bind_key or "default", engine)
+        if not self._listening:
+            event.listen(Session, "after_transaction_create", self._after_transaction_create)
+            event.listen(Session, "after_begin", self._after_begin)
+            self._listening = True
+        got_request_exception.connect(self._on_request_exception, app, weak=False)
+        app.extensions["pool_metrics"] = self
+
+    def _watch(self, name, engine):
+        stats = PoolStats(self.WAIT_WINDOW, self.slow_seconds)
+        self._stats[name] = stats
+        self._engines[name] = engine
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            stats.record_checkout(engine.pool)
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            stats.record_connect()
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            stats.record_invalidate()
+
+    def _stats_for(self, engine):
+        for name, watched in self._engines.items():
+            if watched is engine:
+                return self._stats[name]
+        return None
+
+    @staticmethod
+    def _after_transaction_create(session, transaction):
+        if transaction.parent is None:
+            session.info[_WAIT_KEY] = time.perf_counter()
+
+    def _after_begin(self, session, transaction, connection):
+        started = session.info.pop(_WAIT_KEY, None)
+        if started is None:
+            return
+        stats = self._stats_for(connection.engine)
+        if stats is not None:
+            stats.record_wait(time.perf_counter() - started)
+
+    def _on_request_exception(self, sender, exception, **extra):
+        if isinstance(exception, PoolTimeoutError):
+            with self._lock:
+                self.timeouts += 1
+
+    def snapshot(self):
+        """Current pool state and counters for every bind, JSON-ready."""
+        import numpy as np
+
+        pools = {}
+        for name, stats in self._stats.items():
+            pool = self._engines[name].pool
+            with stats.lock:
+                waits = np.fromiter(stats.waits, dtype=float) * 1000
+                data = {
+                    "pool_class": type(pool).__name__,
+                    "checkouts": stats.checkouts,
+                    "connects": stats.connects,
+                    "invalidated": stats.invalidated,
+                    "slow_checkouts": stats.slow_checkouts,
+                    "peak_in_use": stats.peak_in_use,
+                    "peak_overflow": stats.peak_overflow,
+                    "wait_ms": {
+                        "samples": len(waits),
+                        "avg": round(float(waits.mean()), 3) if len(waits) else 0,
+                        "p50": round(float(np.percentile(waits, 50)), 3) if len(waits) else 0,
+                        "p95": round(float(np.percentile(waits, 95)), 3) if len(waits) else 0,
+                        "p99": round(float(np.percentile(waits, 99)), 3) if len(waits) else 0,
+                        "max": round(stats.wait_max * 1000, 3),
+                    },
+                }
+            if isinstance(pool, QueuePool):
+                data.update({
+                    "size": pool.size(),
+                    "in_use": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    "timeout": pool.timeout(),
+                })
+            pools[name] = data
+        return {"pid": os.getpid(), "checkout_timeouts": self.timeouts, "pools": pools}
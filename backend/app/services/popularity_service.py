@@ -0,0 +1,115 @@
+"""Product popularity scores.
+
+``products.popularity_score`` ranks ``sort=popular`` and breaks ties in search
+results. It is recomputed by ``flask recompute-popularity`` (run from cron)
+rather than on every order, and combines:
+
+* sales velocity: units sold in non-cancelled orders over the last
+  ``WINDOW_DAYS``, each day's units weighted by ``0.5 ** (age / HALF_LIFE_DAYS)``
+  and taken as ``log1p`` so a few bestsellers don't flatten everything else;
+* ratings: the Bayesian average rating (``RATING_PRIOR`` reviews at the
+  catalog-wide mean), scaled to 0..1, times ``RATING_WEIGHT``.
+
+The database does the aggregation (units per product per day, review count
+and rating sum per product); decay and scoring are vectorized with NumPy and
+only scores that changed are written back.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, func, select
+
+from app.extensions import db
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.review import Review
+
+
+def _utcnow():
+    # Naive UTC, matching how DateTime columns are stored
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _as_date(value):
+    # func.date() comes back as a date on MySQL and as a string on SQLite
+    return value if hasattr(value, "toordinal") else datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+class PopularityService:
+
+    WINDOW_DAYS = 90
+    HALF_LIFE_DAYS = 14
+    RATING_PRIOR = 5
+    RATING_WEIGHT = 1.0
+    WRITE_BATCH = 1000
+
+    @staticmethod
+    def compute_scores(now=None):
+        """Return ``(product_ids, scores)`` as NumPy arrays for every product."""
+        import numpy as np
+
+        now = now or _utcnow()
+        product_ids = np.array(db.session.scalars(select(Product.id).order_by(Product.id)).all(), dtype=np.int64)
+        if not len(product_ids):
+            return product_ids, np.zeros(0)
+
+        day = func.date(Order.created_at)
+        sales = db.session.execute(
+            select(OrderItem.product_id, day, func.sum(OrderItem.quantity))
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.created_at >= now - timedelta(days=PopularityService.WINDOW_DAYS),
+                   Order.status != "CANCELLED")
+            .group_by(OrderItem.product_id, day)
+        ).all()
+        ratings = db.session.execute(
+            select(Review.product_id, func.count(Review.id), func.sum(Review.rating)).group_by(Review.product_id)
+        ).all()
+
+        units = np.zeros(len(product_ids))
+        if sales:
+            today = now.date().toordinal()
+            index = np.searchsorted(product_ids, [row[0] for row in sales])
+            age = today - np.array([_as_date(row[1]).toordinal() for row in sales], dtype=np.float64)
+            decayed = np.array([row[2] for row in sales], dtype=np.float64) * 0.5 ** (age / PopularityService.HALF_LIFE_DAYS)
+            units = np.bincount(index, weights=decayed, minlength=len(product_ids))
+
+        review_count = np.zeros(len(product_ids))
+        rating_sum = np.zeros(len(product_ids))
+        if ratings:
+            index = np.searchsorted(product_ids, [row[0] for row in ratings])
+            review_count[index] = [row[1] for row in ratings]
+            rating_sum[index] = [row[2] for row in ratings]
+        prior = PopularityService.RATING_PRIOR
+        mean_rating = rating_sum.sum() / review_count.sum() if review_count.sum() else 3.0
+        bayes_rating = (prior * mean_rating + rating_sum) / (prior + review_count)
+
+        scores = np.log1p(units) + PopularityService.RATING_WEIGHT * (bayes_rating - 1) / 4
+        return product_ids, np.round(scores, 4)
+
+    @staticmethod
+    def recompute():
+        """Recompute and store every product's popularity score. Returns a report dict."""
+        import numpy as np
+
+        started = time.perf_counter()
+        product_ids, scores = PopularityService.compute_scores()
+        current = dict(db.session.execute(select(Product.id, Product.popularity_score)).all())
+        stored = np.array([current.get(int(pid)) or 0 for pid in product_ids], dtype=np.float64)
+        changed = np.flatnonzero(~np.isclose(stored, scores, rtol=0, atol=1e-4))
+
+        table = Product.__table__
+        # updated_at is kept as is: a score change is not a product edit
+        # (the similar-products indexer keys off updated_at)
+        update = table.update().where(table.c.id == bindparam("pid"))\
+            .values(popularity_score=bindparam("score"), updated_at=table.c.updated_at)
+        values = [{"pid": int(product_ids[i]), "score": float(scores[i])} for i in changed]
+        for start in range(0, len(values), PopularityService.WRITE_BATCH):
+            db.session.execute(update, values[start:start + PopularityService.WRITE_BATCH])
+        db.session.commit()
+
+        return {
+            "products": len(product_ids),
+            "updated": len(values),
+            "max_score": float(scores.max()) if len(scores) else 0.0,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+
+
+class PricingService:
+
+    @staticmethod
+    def coupon_error(coupon, subtotal):
+        """Explain why ``coupon`` gives no discount on ``subtotal``, or None if it applies."""
+        if coupon is None:
+            return "Invalid coupon code"
+        if not coupon.is_active:
+            return "This coupon is no longer active"
+        if coupon.usage_limit and coupon.times_used >= coupon.usage_limit:
+            return "This coupon has reached its usage limit"
+        if not coupon.is_valid:
+            return "This coupon has expired"
+        if subtotal < coupon.min_order_amount:
+            return f"Minimum order amount of ${coupon.min_order_amount:.2f} required to use this coupon"
+        return None
+
+    @staticmethod
+    def price_items(items, coupon=None, coupon_code=None):
+        """Price cart lines and apply a coupon in a single pass.
+
+        ``items`` yields ``(product_id, product, quantity)`` with products
+        already loaded. Line problems are collected in ``errors`` using the
+        messages checkout reports; the quote is still computed for the rest.
+        Missing and out-of-stock products are left out of the lines and totals.
+        """
+        lines = []
+        errors = []
+        subtotal = 0
+
+        for product_id, product, quantity in items:
+            if not product:
+                errors.append(f"Product ID {product_id} not found")
+                continue
+            if not product.is_available:
+                errors.append(f"'{product.name}' is out of stock")
+                continue
+            if product.stock < quantity:
+                errors.append(f"Insufficient stock for '{product.name}'. Only {product.stock} available")
+            if product.price <= 0:
+                errors.append(f"Invalid price for '{product.name}'")
+                continue
+
+            line_total = product.price * quantity
+            subtotal += line_total
+            lines.append({
+                "product_id": product.id,
+                "name": product.name,
+                "quantity": quantity,
+                "unit_price": product.price,
+                "line_total": round(line_total, 2),
+            })
+
+        discount = 0
+        coupon_error = None
+        if coupon is not None or coupon_code:
+            coupon_error = PricingService.coupon_error(coupon, subtotal)
+            if coupon_error is None:
+                discount = coupon.calculate_discount(subtotal)
+
+        return {
+            "lines": lines,
+            "subtotal": round(subtotal, 2),
+            "discount": round(discount, 2),
+            "total": round(max(0, subtotal - discount), 2),
+            "coupon_code": coupon.code if coupon is not None else (coupon_code.upper() if coupon_code else None),
+            "coupon_applied": discount > 0,
+            "coupon_error": coupon_error,
+            "errors": errors,
+        }
+
+    @staticmethod
+    def rank_coupons(table, subtotal, limit=10):
+        """Rank every coupon in ``table`` by the discount it gives on ``subtotal``.
+
+        Mirrors ``Coupon.is_valid`` and ``Coupon.calculate_discount`` over whole
+        columns at once, then re-checks the returned coupons with
+        ``calculate_discount`` itself so amounts match checkout exactly.
+        """
+        import numpy as np
+
+        if not len(table) or subtotal <= 0:
+            return []
+
+        now = datetime.now(timezone.utc).timestamp()
+        eligible = (
+            ((table.usage_limit == 0) | (table.times_used < table.usage_limit))
+            & (table.expires_at >= now)
+            & (subtotal >= table.min_order)
+        )
+
+        percent = subtotal * (table.discount_value / 100)
+        percent = np.where(table.max_discount > 0, np.minimum(percent, table.max_discount), percent)
+        discount = np.where(table.is_percent, percent, table.discount_value)
+        discount = np.minimum(discount, subtotal)
+        discount = np.where(eligible & (discount > 0), discount, -1.0)
+
+        candidates = np.flatnonzero(discount > 0)
+        if len(candidates) > limit:
+            top = np.argpartition(-discount[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-discount[candidates], kind="stable")]
+
+        ranked = []
+        for i in candidates:
+            coupon = table.coupon(i)
+            amount = coupon.calculate_discount(subtotal)
+            ranked.append({
+                "coupon": coupon.to_dict(),
+                "discount": amount,
+                "final_total": round(max(0, subtotal - amount), 2),
+            })
+        ranked.sort(key=lambda r: -r["discount"])
+        return ranked
@@ -0,0 +1,113 @@
+"""Verified-purchase index.
+
+``user_purchased_products`` holds a row per (user, product) the user has in
+at least one non-cancelled order, with the number of such orders. Placing an
+order adds one to each of its products (an upsert, so concurrent orders for
+the same product don't collide); cancelling takes one off and drops rows that
+reach zero. CANCELLED is terminal, so no other status change affects it.
+
+``flask backfill-purchases`` rebuilds the table from orders in one
+INSERT ... SELECT.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.order import Order, OrderItem
+from app.models.purchase import UserPurchasedProduct
+
+
+class PurchaseIndex:
+
+    @staticmethod
+    def has_purchased(user_id, product_id):
+        return db.session.get(UserPurchasedProduct, (user_id, product_id)) is not None
+
+    @staticmethod
+    def _upsert_increment(table):
+        """Native insert-or-increment statement, or None when the dialect has none."""
+        dialect = db.engine.dialect.name
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert as upsert
+
+            return upsert(table).on_duplicate_key_update(orders=table.c.orders + 1)
+        if dialect in ("sqlite", "postgresql"):
+            from sqlalchemy.dialects import postgresql, sqlite
+
+            upsert = (sqlite if dialect == "sqlite" else postgresql).insert
+            return upsert(table).on_conflict_do_update(
+                index_elements=["user_id", "product_id"], set_={"orders": table.c.orders + 1},
+            )
+        return None
+
+    @staticmethod
+    def _increment_each(table, rows):
+        """Portable insert-or-increment: lock and bump existing rows, insert the rest."""
+        for row in rows:
+            key = (table.c.user_id == row["user_id"]) & (table.c.product_id == row["product_id"])
+            existing = db.session.execute(select(table.c.orders).where(key).with_for_update()).first()
+            if existing is None:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(table).values(**row))
+                    continue
+                except IntegrityError:
+                    pass    # a concurrent order inserted it first; its row is committed now
+            db.session.execute(table.update().where(key).values(orders=table.c.orders + 1))
+
+    @staticmethod
+    def record_order(user_id, product_ids):
+        """Count a newly placed order for each of ``product_ids``."""
+        product_ids = sorted(set(product_ids))
+        if not product_ids:
+            return
+        table = UserPurchasedProduct.__table__
+        now = datetime.now(timezone.utc)
+        rows = [{"user_id": user_id, "product_id": pid, "orders": 1, "created_at": now} for pid in product_ids]
+        upsert = PurchaseIndex._upsert_increment(table)
+        if upsert is None:
+            PurchaseIndex._increment_each(table, rows)
+        else:
+            db.session.execute(upsert, rows)
+
+    @staticmethod
+    def release_orders(order_ids):
+        """Uncount orders that are being cancelled."""
+        if not order_ids:
+            return
+        counts = db.session.execute(
+            select(Order.user_id, OrderItem.product_id, func.count(func.distinct(Order.id)))
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .where(Order.id.in_(order_ids))
+            .group_by(Order.user_id, OrderItem.product_id)
+        ).all()
+        if not counts:
+            return
+        table = UserPurchasedProduct.__table__
+        db.session.execute(
+            table.update()
+            .where(table.c.user_id == bindparam("uid"), table.c.product_id == bindparam("pid"))
+            .values(orders=table.c.orders - bindparam("n")),
+            [{"uid": user_id, "pid": product_id, "n": n} for user_id, product_id, n in counts],
+        )
+        db.session.execute(delete(UserPurchasedProduct).where(
+            UserPurchasedProduct.user_id.in_({user_id for user_id, _, _ in counts}),
+            UserPurchasedProduct.orders <= 0,
+        ))
+
+    @staticmethod
+    def backfill():
+        """Rebuild the index from all non-cancelled orders; returns the row count."""
+        db.session.execute(delete(UserPurchasedProduct))
+        purchases = select(
+            Order.user_id, OrderItem.product_id, func.count(func.distinct(Order.id)), func.min(Order.created_at),
+        ).join(OrderItem, OrderItem.order_id == Order.id)\
+            .where(Order.status != "CANCELLED")\
+            .group_by(Order.user_id, OrderItem.product_id)
+        db.session.execute(insert(UserPurchasedProduct).from_select(
+            ["user_id", "product_id", "orders", "created_at"], purchases,
+        ))
+        db.session.commit()
+        return db.session.scalar(select(func.count()).select_from(UserPurchasedProduct))
@@ -0,0 +1,462 @@
+"""Offline product recommendations.
+
+Neighbors are computed by batch jobs (``flask build-bought-together``,
+``flask build-similar``) and stored in ``product_neighbors``; the API only reads them back with one
+primary-key range lookup per request.
+
+Frequently bought together
+--------------------------
+Orders are turned into a sparse order x product incidence matrix ``B`` and
+the co-occurrence counts are ``C = B.T @ B``: ``C[a, b]`` is the number of
+orders containing both products and ``C[a, a]`` the number containing ``a``.
+Neighbors are ranked by lift, ``C[a, b] * N / (C[a, a] * C[b, b])``, among
+pairs seen in at least ``min_support`` orders.
+
+Counts are kept in ``product_pair_counts`` so each run only reads orders newer
+than the last one (by id, skipping the last ``SETTLE_SECONDS`` so orders still
+being committed are not missed) and recomputes neighbors for the products
+those orders touched, plus products co-bought with them, whose lift changed.
+Other products keep scores computed with the previous order total; that
+scales all of their lifts equally, so their ranking is still correct.
+Cancelled orders are left out; an order cancelled after it was counted stays
+counted until the next ``--full`` rebuild.
+
+Similar products
+----------------
+Each active product's name, brand, category and description are turned into
+a TF-IDF vector (sublinear term frequency, smoothed IDF, L2-normalised), so a
+row product of the matrix gives cosine similarity. Scores are computed a
+block of rows at a time with at most ``SIMILARITY_BLOCK_CELLS`` cells per
+block, keeping memory bounded however large the catalog is.
+
+Incremental runs only score products updated since the last run against the
+catalog. Their new scores are merged into the stored lists of the other
+products; a product whose full list contained a changed product is rescored
+from scratch, since something outside its stored list may now rank higher.
+IDF weights are taken from the current catalog each run, so scores between
+two unchanged products drift slightly until the next ``--full`` rebuild, as
+do lists that lost a deleted product.
+"""
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, delete, insert, select
+
+from app.extensions import db
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.recommendation import ProductNeighbor, ProductPairCount, RecommendationRun
+
+BOUGHT_TOGETHER = "bought_together"
+SIMILAR = "similar"
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the this to with "
+    "you your".split()
+)
+
+
+def _utcnow():
+    # Naive UTC, matching how DateTime columns are stored
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _chunks(values, size=1000):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _terms(text, weight=1):
+    """Counter of indexable tokens in ``text``, each counted ``weight`` times."""
+    tokens = [t for t in TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in STOP_WORDS]
+    return Counter({token: n * weight for token, n in Counter(tokens).items()})
+
+
+class RecommendationService:
+
+    SETTLE_SECONDS = 60
+    MAX_NEIGHBORS = 20
+    WRITE_BATCH = 1000
+
+    # Similar products: field weights, score floor, cells per score block, and
+    # the share of changed products above which an incremental run goes full
+    FIELD_WEIGHTS = {"name": 3, "brand": 2, "category": 2, "description": 1}
+    MIN_SIMILARITY = 0.05
+    SIMILARITY_BLOCK_CELLS = 4_000_000
+    FULL_REBUILD_RATIO = 0.25
+
+    @staticmethod
+    def neighbors(kind, product_id, limit=8):
+        """Stored neighbors of ``product_id`` that are still active, best first."""
+        rows = db.session.query(ProductNeighbor)\
+            .join(Product, Product.id == ProductNeighbor.neighbor_id)\
+            .options(db.contains_eager(ProductNeighbor.neighbor))\
+            .filter(ProductNeighbor.kind == kind,
+                    ProductNeighbor.product_id == product_id,
+                    Product.is_active == True)\
+            .order_by(ProductNeighbor.position).limit(limit).all()
+        return [
+            {**row.neighbor.to_summary(), "score": round(row.score, 4), "support": row.support}
+            for row in rows
+        ]
+
+    @staticmethod
+    def _replace_neighbors(kind, rows_by_product):
+        """Swap the stored neighbors of every product in ``rows_by_product``."""
+        product_ids = list(rows_by_product)
+        for chunk in _chunks(product_ids):
+            db.session.execute(delete(ProductNeighbor).where(
+                ProductNeighbor.kind == kind, ProductNeighbor.product_id.in_(chunk),
+            ))
+        values = [
+            {"kind": kind, "product_id": product_id, "position": position,
+             "neighbor_id": neighbor_id, "score": score, "support": support}
+            for product_id, rows in rows_by_product.items()
+            for position, (neighbor_id, score, support) in enumerate(rows)
+        ]
+        for chunk in _chunks(values, RecommendationService.WRITE_BATCH):
+            db.session.execute(insert(ProductNeighbor), chunk)
+        return len(values)
+
+    # ── Frequently bought together ──
+
+    @staticmethod
+    def _load_pair_counts(shape):
+        import numpy as np
+        from scipy import sparse
+
+        rows = db.session.execute(
+            select(ProductPairCount.product_id, ProductPairCount.other_id, ProductPairCount.orders)
+        ).all()
+        if not rows:
+            return sparse.csr_matrix(shape, dtype=np.int64)
+        data = np.array(rows, dtype=np.int64)
+        return sparse.csr_matrix((data[:, 2], (data[:, 0], data[:, 1])), shape=shape)
+
+    @staticmethod
+    def _store_pair_counts(old, delta):
+        """Write ``old + delta`` for the pairs in ``delta`` (upper triangle)."""
+        import numpy as np
+
+        rows, cols, added = delta.row, delta.col, delta.data
+        previous = np.asarray(old[rows, cols]).ravel()
+        table = ProductPairCount.__table__
+        update = table.update()\
+            .where(table.c.product_id == bindparam("pid"), table.c.other_id == bindparam("oid"))\
+            .values(orders=bindparam("n"))
+
+        existing = previous > 0
+        updates = [{"pid": int(r), "oid": int(c), "n": int(n)}
+                   for r, c, n in zip(rows[existing], cols[existing], previous[existing] + added[existing])]
+        inserts = [{"product_id": int(r), "other_id": int(c), "orders": int(n)}
+                   for r, c, n in zip(rows[~existing], cols[~existing], added[~existing])]
+        for chunk in _chunks(updates, RecommendationService.WRITE_BATCH):
+            db.session.execute(update, chunk)
+        for chunk in _chunks(inserts, RecommendationService.WRITE_BATCH):
+            db.session.execute(insert(ProductPairCount), chunk)
+        return len(updates) + len(inserts)
+
+    @staticmethod
+    def _top_lift(counts, order_total, product_ids, top_k, min_support, valid):
+        """Top-``top_k`` lift neighbors for each product in ``product_ids``.
+
+        ``counts`` is the full symmetric co-occurrence matrix in CSR form.
+        """
+        import numpy as np
+
+        item_orders = counts.diagonal().astype(np.float64)
+        result = {}
+        for a in product_ids:
+            start, end = counts.indptr[a], counts.indptr[a + 1]
+            cols = counts.indices[start:end]
+            support = counts.data[start:end]
+            keep = (cols != a) & (support >= min_support) & valid[cols]
+            cols, support = cols[keep], support[keep]
+            if not len(cols) or not valid[a]:
+                result[int(a)] = []
+                continue
+            lift = support * order_total / (item_orders[a] * item_orders[cols])
+            if len(cols) > top_k:
+                best = np.argpartition(-lift, top_k - 1)[:top_k]
+                cols, support, lift = cols[best], support[best], lift[best]
+            order = np.lexsort((-support, -lift))
+            result[int(a)] = [(int(cols[i]), float(lift[i]), int(support[i])) for i in order]
+        return result
+
+    @staticmethod
+    def build_bought_together(top_k=10, min_support=2, full=False):
+        """Fold orders placed since the last run into the co-occurrence counts
+        and refresh the affected neighbor lists. Returns a report dict."""
+        import numpy as np
+        from scipy import sparse
+
+        started = time.perf_counter()
+        run = db.session.get(RecommendationRun, BOUGHT_TOGETHER)
+        if full or run is None:
+            db.session.execute(delete(ProductPairCount))
+            db.session.execute(delete(ProductNeighbor).where(ProductNeighbor.kind == BOUGHT_TOGETHER))
+            if run is None:
+                run = RecommendationRun(kind=BOUGHT_TOGETHER)
+                db.session.add(run)
+            run.last_order_id, run.order_count = 0, 0
+
+        cutoff = _utcnow() - timedelta(seconds=RecommendationService.SETTLE_SECONDS)
+        watermark = db.session.scalar(
+            select(db.func.max(Order.id)).where(Order.id > run.last_order_id, Order.created_at <= cutoff)
+        )
+        report = {"orders": 0, "pairs_written": 0, "products_refreshed": 0, "neighbors_written": 0}
+        if watermark is None:
+            db.session.commit()
+            report["seconds"] = round(time.perf_counter() - started, 3)
+            return report
+
+        items = db.session.execute(
+            select(OrderItem.order_id, OrderItem.product_id)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.id > run.last_order_id, Order.id <= watermark, Order.status != "CANCELLED")
+        ).all()
+        product_ids = set(db.session.scalars(select(Product.id)).all())
+        max_pair_id = db.session.scalar(select(db.func.max(ProductPairCount.other_id))) or 0
+        size = max([max_pair_id, *product_ids, *(pid for _, pid in items)], default=0) + 1
+
+        delta = sparse.coo_matrix((size, size), dtype=np.int64)
+        new_orders = 0
+        if items:
+            pairs = np.array(items, dtype=np.int64)
+            orders, order_index = np.unique(pairs[:, 0], return_inverse=True)
+            incidence = sparse.csr_matrix(
+                (np.ones(len(pairs), dtype=np.int64), (order_index, pairs[:, 1])), shape=(len(orders), size),
+            )
+            incidence.data[:] = 1  # a product listed twice in one order counts once
+            delta = sparse.triu(incidence.T @ incidence).tocoo()
+            new_orders = len(orders)
+
+        old = RecommendationService._load_pair_counts((size, size))
+        report["pairs_written"] = RecommendationService._store_pair_counts(old, delta)
+
+        upper = (old + delta).tocsr()
+        counts = (upper + sparse.triu(upper, k=1).T).tocsr()
+        order_total = run.order_count + new_orders
+
+        touched = np.unique(np.concatenate([delta.row, delta.col]))
+        if len(touched):
+            # Lift of a -> b also depends on how often b sells, so products
+            # co-bought with a touched product need refreshing too
+            touched = np.union1d(touched, np.unique(counts[touched].indices))
+        valid = np.zeros(size, dtype=bool)
+        valid[list(product_ids)] = True
+        neighbors = RecommendationService._top_lift(counts, order_total, touched, top_k, min_support, valid)
+        neighbors = {pid: rows for pid, rows in neighbors.items() if pid in product_ids}
+        report["neighbors_written"] = RecommendationService._replace_neighbors(BOUGHT_TOGETHER, neighbors)
+
+        run.last_order_id = watermark
+        run.order_count = order_total
+        run.finished_at = _utcnow()
+        db.session.commit()
+
+        report.update({
+            "orders": new_orders,
+            "products_refreshed": len(neighbors),
+            "seconds": round(time.perf_counter() - started, 3),
+        })
+        return report
+
+    # ── Similar products ──
+
+    @staticmethod
+    def _tfidf(documents):
+        """L2-normalised TF-IDF matrix (CSR, one row per document) from term Counters."""
+        import numpy as np
+        from scipy import sparse
+
+        vocabulary, indices, data, indptr = {}, [], [], [0]
+        for terms in documents:
+            for token, count in terms.items():
+                indices.append(vocabulary.setdefault(token, len(vocabulary)))
+                data.append(count)
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr)),
+            shape=(len(documents), max(len(vocabulary), 1)),
+        )
+        document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+        matrix.data = (1 + np.log(matrix.data)) * idf[matrix.indices]
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ matrix
+
+    @staticmethod
+    def _similarity_blocks(matrix, transposed, rows):
+        """Yield ``(rows_in_block, dense cosine scores)`` for ``rows`` against every row."""
+        import numpy as np
+
+        block_rows = max(1, RecommendationService.SIMILARITY_BLOCK_CELLS // max(matrix.shape[0], 1))
+        for start in range(0, len(rows), block_rows):
+            block = rows[start:start + block_rows]
+            scores = (matrix[block] @ transposed).toarray()
+            scores[np.arange(len(block)), block] = 0  # a product is not its own neighbor
+            yield block, scores
+
+    @staticmethod
+    def _best_similar(scores, ids, top_k):
+        import numpy as np
+
+        candidates = np.flatnonzero(scores >= RecommendationService.MIN_SIMILARITY)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(ids[j]), float(scores[j]), None) for j in candidates]
+
+    @staticmethod
+    def _stored_similar(product_ids):
+        stored = {}
+        for chunk in _chunks(product_ids):
+            rows = db.session.execute(
+                select(ProductNeighbor.product_id, ProductNeighbor.neighbor_id, ProductNeighbor.score)
+                .where(ProductNeighbor.kind == SIMILAR, ProductNeighbor.product_id.in_(chunk))
+                .order_by(ProductNeighbor.product_id, ProductNeighbor.position)
+            ).all()
+            for product_id, neighbor_id, score in rows:
+                stored.setdefault(product_id, []).append((neighbor_id, score))
+        return stored
+
+    @staticmethod
+    def build_similar(top_k=10, full=False):
+        """Refresh content-based "similar products" neighbors for products
+        changed since the last run (all products with ``full``). Returns a report dict."""
+        import numpy as np
+        from app.models.category import Category
+
+        started = time.perf_counter()
+        weights = RecommendationService.FIELD_WEIGHTS
+        run = db.session.get(RecommendationRun, SIMILAR)
+        if run is None:
+            run = RecommendationRun(kind=SIMILAR, last_order_id=0, order_count=0)
+            db.session.add(run)
+            full = True
+        elif run.last_product_update is None:
+            full = True
+        # Products saved while this run reads the catalog are picked up next time
+        watermark = _utcnow() - timedelta(seconds=RecommendationService.SETTLE_SECONDS)
+
+        changed_ids = set()
+        if not full:
+            changed_ids = set(db.session.scalars(
+                select(Product.id).where(Product.updated_at > run.last_product_update)
+            ).all())
+        report = {"full": full, "products": 0, "changed": len(changed_ids), "products_refreshed": 0,
+                  "neighbors_written": 0}
+
+        lists = {}
+        if full or changed_ids:
+            catalog = db.session.execute(
+                select(Product.id, Product.name, Product.brand, Category.name, Product.description)
+                .outerjoin(Category, Category.id == Product.category_id)
+                .where(Product.is_active == True)
+                .order_by(Product.id)
+            ).all()
+            ids = np.array([row[0] for row in catalog], dtype=np.int64)
+            position = {int(pid): i for i, pid in enumerate(ids)}
+            report["products"] = len(ids)
+            matrix = RecommendationService._tfidf([
+                _terms(name, weights["name"]) + _terms(brand, weights["brand"])
+                + _terms(category, weights["category"]) + _terms(description, weights["description"])
+                for _, name, brand, category, description in catalog
+            ])
+            transposed = matrix.T.tocsr()
+
+            changed_rows = np.array(sorted(position[p] for p in changed_ids if p in position), dtype=np.int64)
+            if not full and len(changed_rows) > RecommendationService.FULL_REBUILD_RATIO * len(ids):
+                full = report["full"] = True
+            if full:
+                changed_rows = np.arange(len(ids))
+                db.session.execute(delete(ProductNeighbor).where(ProductNeighbor.kind == SIMILAR))
+            report["changed"] = len(changed_rows)
+
+            unchanged = np.ones(len(ids), dtype=bool)
+            unchanged[changed_rows] = False
+            found_cols, found_rows, found_scores = [], [], []
+            blocks = RecommendationService._similarity_blocks(matrix, transposed, changed_rows)
+            for block, scores in blocks:
+                for i, row_scores in zip(block, scores):
+                    lists[int(ids[i])] = RecommendationService._best_similar(row_scores, ids, top_k)
+                if full:
+                    continue
+                # Best top_k changed products for every unchanged product in this block
+                scores[:, ~unchanged] = 0
+                if len(block) > top_k:
+                    best = np.argpartition(-scores, top_k - 1, axis=0)[:top_k]
+                else:
+                    best = np.broadcast_to(np.arange(len(block))[:, None], scores.shape)
+                best_scores = np.take_along_axis(scores, best, axis=0)
+                keep = best_scores >= RecommendationService.MIN_SIMILARITY
+                found_cols.append(np.nonzero(keep)[1])
+                found_rows.append(block[best[keep]])
+                found_scores.append(best_scores[keep])
+
+            if not full:
+                lists.update(RecommendationService._merge_similar(
+                    ids, position, changed_ids, top_k, matrix, transposed,
+                    np.concatenate(found_cols or [np.array([], dtype=np.int64)]),
+                    np.concatenate(found_rows or [np.array([], dtype=np.int64)]),
+                    np.concatenate(found_scores or [np.array([])]),
+                ))
+                # Changed products that are no longer active lose their list
+                lists.update({pid: [] for pid in changed_ids if pid not in position})
+
+        report["neighbors_written"] = RecommendationService._replace_neighbors(SIMILAR, lists)
+        run.last_product_update = watermark
+        run.finished_at = _utcnow()
+        db.session.commit()
+
+        report.update({
+            "products_refreshed": len(lists),
+            "seconds": round(time.perf_counter() - started, 3),
+        })
+        return report
+
+    @staticmethod
+    def _merge_similar(ids, position, changed_ids, top_k, matrix, transposed, cols, rows, scores):
+        """New lists for unchanged products affected by ``changed_ids``.
+
+        ``cols``/``rows``/``scores`` hold each unchanged product's best scores
+        against the changed products.
+        """
+        import numpy as np
+
+        found = {}
+        for col, row, score in zip(cols.tolist(), rows.tolist(), scores.tolist()):
+            found.setdefault(int(ids[col]), []).append((int(ids[row]), score))
+
+        stale = set()
+        for chunk in _chunks(changed_ids):
+            stale.update(db.session.scalars(
+                select(ProductNeighbor.product_id).distinct()
+                .where(ProductNeighbor.kind == SIMILAR, ProductNeighbor.neighbor_id.in_(chunk))
+            ).all())
+        affected = (set(found) | stale) - changed_ids
+        stored = RecommendationService._stored_similar(affected)
+
+        lists, rescore = {}, []
+        for product_id in affected:
+            if product_id not in position:
+                continue
+            current = stored.get(product_id, [])
+            kept = [(n, s) for n, s in current if n not in changed_ids and n in position]
+            if len(kept) < len(current) and len(current) >= top_k:
+                rescore.append(position[product_id])
+                continue
+            merged = sorted(kept + found.get(product_id, []), key=lambda pair: (-pair[1], pair[0]))[:top_k]
+            if merged != current:
+                lists[product_id] = [(n, s, None) for n, s in merged]
+
+        rescore = np.array(sorted(rescore), dtype=np.int64)
+        for block, block_scores in RecommendationService._similarity_blocks(matrix, transposed, rescore):
+            for i, row_scores in zip(block, block_scores):
+                lists[int(ids[i])] = RecommendationService._best_similar(row_scores, ids, top_k)
+        return lists
@@ -0,0 +1,117 @@
+"""Read-replica routing.
+
+Replicas are ordinary Flask-SQLAlchemy binds named ``replica_<n>`` (built
+from ``DATABASE_REPLICA_URLS``). For each request the router decides whether
+``db.session`` may read from a replica:
+
+* only GET/HEAD requests to the read-only catalog blueprints (products,
+  categories, reviews) are eligible; everything else uses the primary;
+* after a successful write the response sets a short-lived
+  ``db_primary_until`` cookie, and requests carrying it read from the
+  primary, so users see their own writes despite replication lag;
+* flushes always go to the primary, even inside a replica-routed request;
+* if a replica raises a connection error the request is re-run on the primary
+  and that replica is skipped for ``REPLICA_RETRY_AFTER`` seconds.
+
+To try it locally, copy the SQLite database file and point
+``DATABASE_REPLICA_URLS`` at the copy.
+"""
+import itertools
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+
+class RoutingSession(Session):
+    """``db.session`` class that sends reads to the replica chosen for the request."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            replica = g.get("db_replica")
+            if replica:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+
+    READ_BLUEPRINTS = {"products", "categories", "reviews"}
+    STICKY_COOKIE = "db_primary_until"
+
+    def __init__(self, app=None):
+        self.replicas = []
+        self.sticky_seconds = 5
+        self.retry_after = 30
+        self._down_until = {}
+        self._cycle = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.replicas = sorted(k for k in app.config.get("SQLALCHEMY_BINDS", {}) if k.startswith("replica_"))
+        self.sticky_seconds = app.config.get("REPLICA_STICKY_SECONDS", 5)
+        self.retry_after = app.config.get("REPLICA_RETRY_AFTER", 30)
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        app.extensions["replica_router"] = self
+        if not self.replicas:
+            return
+
+        app.before_request(self._choose_bind)
+        app.after_request(self._mark_write)
+        app.register_error_handler(DBAPIError, self._on_db_error)
+
+    def _is_read_only(self):
+        return request.method in ("GET", "HEAD") and request.blueprint in self.READ_BLUEPRINTS
+
+    def _is_sticky(self):
+        try:
+            return float(request.cookies.get(self.STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def pick_replica(self):
+        now = time.time()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = next(self._cycle)
+                if self._down_until.get(replica, 0) <= now:
+                    return replica
+        return None
+
+    def _choose_bind(self):
+        g.db_replica = None
+        if self._is_read_only() and not self._is_sticky():
+            g.db_replica = self.pick_replica()
+
+    def _mark_write(self, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(
+                self.STICKY_COOKIE,
+                str(int(time.time() + self.sticky_seconds)),
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def _on_db_error(self, error):
+        from app.extensions import db
+
+        replica = g.get("db_replica")
+        is_connection_error = error.connection_invalidated or isinstance(error, (OperationalError, InterfaceError))
+        if not replica or not is_connection_error:
+            raise error
+
+        current_app.logger.warning("Replica %s failed, falling back to primary: %s", replica, error)
+        with self._lock:
+            self._down_until[replica] = time.time() + self.retry_after
+        db.session.rollback()
+        g.db_replica = None
+        # Catalog GETs are read-only, so running the view again is safe
+        view = current_app.view_functions[request.endpoint]
+        return current_app.make_response(current_app.ensure_sync(view)(**request.view_args))
+
@@ -0,0 +1,109 @@
+"""Per-product review stats cache.
+
+The stats block on a product's review page (average, total and the 1-5 star
+distribution) comes from one aggregate query, a LEFT JOIN from the product so
+the same query also says whether the product exists. Results are kept per
+product in an LRU of ``REVIEW_STATS_CACHE_SIZE`` entries for up to
+``REVIEW_STATS_CACHE_TTL`` seconds.
+
+Review inserts, updates and deletes drop the product's entry when they are
+flushed and again after the transaction commits, so a page read between the
+two can't leave pre-commit stats behind. Writes made through other workers
+show up once the entry expires. Misses are loaded from the primary even on
+replica-routed requests: a lagging replica read right after an invalidation
+would otherwise be cached for the full TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_DIRTY_KEY = "review_stats_dirty"
+
+
+class ReviewStatsCache:
+
+    def __init__(self, app=None):
+        self.ttl = 300
+        self.max_products = 10000
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("REVIEW_STATS_CACHE_TTL", 300)
+        self.max_products = app.config.get("REVIEW_STATS_CACHE_SIZE", 10000)
+        app.extensions["review_stats"] = self
+        if not self._listening:
+            from app.models.product import Product
+            from app.models.review import Review
+
+            for name in ("after_insert", "after_update", "after_delete"):
+                event.listen(Review, name, self._on_review_write)
+            event.listen(Product, "after_delete", self._on_product_delete)
+            event.listen(Session, "after_commit", self._after_commit)
+            self._listening = True
+
+    def _on_review_write(self, mapper, connection, target):
+        self.invalidate(target.product_id)
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault(_DIRTY_KEY, set()).add(target.product_id)
+
+    def _on_product_delete(self, mapper, connection, target):
+        self.invalidate(target.id)
+
+    def _after_commit(self, session):
+        for product_id in session.info.pop(_DIRTY_KEY, ()):
+            self.invalidate(product_id)
+
+    def invalidate(self, product_id):
+        with self._lock:
+            self._entries.pop(product_id, None)
+
+    def _load(self, product_id):
+        from app.extensions import db
+        from app.models.product import Product
+        from app.models.review import Review
+
+        stmt = db.select(Product.id, Review.rating, db.func.count(Review.id))\
+            .outerjoin(Review, Review.product_id == Product.id)\
+            .where(Product.id == product_id)\
+            .group_by(Product.id, Review.rating)
+        # An explicit bind bypasses RoutingSession's replica choice
+        rows = db.session.execute(stmt, bind_arguments={"bind": db.engine}).all()
+        if not rows:
+            return None
+
+        distribution = {str(i): 0 for i in range(1, 6)}
+        for _, rating, count in rows:
+            if rating is not None:
+                distribution[str(rating)] = count
+        total = sum(distribution.values())
+        rating_sum = sum(int(rating) * count for rating, count in distribution.items())
+        return {
+            "avg_rating": round(rating_sum / total, 1) if total else 0,
+            "total_reviews": total,
+            "rating_distribution": distribution,
+        }
+
+    def get(self, product_id):
+        """Stats dict for ``product_id``, or None when the product doesn't exist."""
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry and time.time() - entry[1] < self.ttl:
+                self._entries.move_to_end(product_id)
+                return entry[0]
+
+        stats = self._load(product_id)
+        if stats is not None:
+            with self._lock:
+                self._entries[product_id] = (stats, time.time())
+                self._entries.move_to_end(product_id)
+                while len(self._entries) > self.max_products:
+                    self._entries.popitem(last=False)
+        return stats
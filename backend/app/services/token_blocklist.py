@@ -0,0 +1,146 @@
+"""Revoked-token blocklist.
+
+Revoked ``jti`` values are stored in ``revoked_tokens`` and mirrored in an
+in-process dict of ``jti -> expiry``. Checking a token is a dict lookup; the
+mirror is brought up to date at most every ``JWT_BLOCKLIST_REFRESH`` seconds
+by reading only rows with an id above the last one seen, minus a trailing
+window of ``JWT_BLOCKLIST_ID_OVERLAP`` ids: auto-increment ids are assigned at
+insert but become visible at commit, so a lower id can appear after a higher
+one has been read. Other workers' revocations show up within that interval
+while the common case (a token that was never revoked) needs no I/O. Entries leave the mirror once the token
+would have expired anyway, and ``flask purge-revoked-tokens`` deletes them
+from the table.
+
+``revoke_user`` revokes every token of one user at once (e.g. after a role
+change): it stores a ``token_type="user"`` row carrying the user's new
+``token_version``, and tokens whose ``tv`` claim is below it are rejected by
+the same lookup, with no query per request. The row outlives the longest
+token lifetime, after which no token with an older ``tv`` can still be valid.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+
+def _utcnow():
+    # Naive UTC, matching how DateTime columns are stored
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class TokenBlocklist:
+
+    def __init__(self, app=None):
+        self.refresh_interval = 5
+        self.id_overlap = 200
+        self._revoked = {}
+        self._min_version = {}
+        self._last_id = 0
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.extensions import jwt
+
+        self.refresh_interval = app.config.get("JWT_BLOCKLIST_REFRESH", 5)
+        self.id_overlap = app.config.get("JWT_BLOCKLIST_ID_OVERLAP", 200)
+        app.extensions["token_blocklist"] = self
+
+        @jwt.token_in_blocklist_loader
+        def check_if_token_revoked(jwt_header, jwt_payload):
+            return self.is_revoked(jwt_payload["jti"]) or self.is_superseded(jwt_payload)
+
+    def _refresh(self):
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+
+        now = time.time()
+        rows = db.session.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at,
+                                RevokedToken.token_type, RevokedToken.user_id, RevokedToken.token_version)\
+            .filter(RevokedToken.id > self._last_id - self.id_overlap, RevokedToken.expires_at > _utcnow())\
+            .order_by(RevokedToken.id).all()
+        for row_id, jti, expires_at, token_type, user_id, token_version in rows:
+            expires = expires_at.replace(tzinfo=timezone.utc).timestamp()
+            if token_type == "user":
+                self._raise_min_version(user_id, token_version, expires)
+            else:
+                self._revoked[jti] = expires
+            self._last_id = max(self._last_id, row_id)
+        for jti in [j for j, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[jti]
+        for user_id in [u for u, (_, exp) in self._min_version.items() if exp <= now]:
+            del self._min_version[user_id]
+        self._refreshed_at = now
+
+    def _raise_min_version(self, user_id, token_version, expires):
+        current = self._min_version.get(user_id)
+        if current is None or token_version >= current[0]:
+            self._min_version[user_id] = (token_version, max(expires, current[1] if current else 0))
+
+    def _ensure_fresh(self):
+        if self._refreshed_at is None or time.time() - self._refreshed_at > self.refresh_interval:
+            with self._lock:
+                if self._refreshed_at is None or time.time() - self._refreshed_at > self.refresh_interval:
+                    self._refresh()
+
+    def is_revoked(self, jti):
+        self._ensure_fresh()
+        return jti in self._revoked
+
+    def is_superseded(self, jwt_payload):
+        """Whether the token's ``tv`` claim predates its user's last ``revoke_user``."""
+        self._ensure_fresh()
+        entry = self._min_version.get(int(jwt_payload["sub"])) if jwt_payload.get("sub") else None
+        return entry is not None and jwt_payload.get("tv", 0) < entry[0]
+
+    def revoke(self, jwt_payload):
+        """Persist the revocation of a decoded token and apply it locally at once."""
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+
+        jti = jwt_payload["jti"]
+        if RevokedToken.query.filter_by(jti=jti).first() is None:
+            db.session.add(RevokedToken(
+                jti=jti,
+                token_type=jwt_payload.get("type", "access"),
+                user_id=int(jwt_payload["sub"]) if jwt_payload.get("sub") else None,
+                expires_at=datetime.fromtimestamp(jwt_payload["exp"], timezone.utc).replace(tzinfo=None),
+            ))
+            db.session.commit()
+        with self._lock:
+            self._revoked[jti] = float(jwt_payload["exp"])
+
+    def revoke_user(self, user_id, token_version):
+        """Revoke every token of ``user_id`` whose ``tv`` claim is below ``token_version``.
+
+        Adds the row to the session and commits, so callers can make it part
+        of the same transaction as the ``token_version`` bump.
+        """
+        from flask import current_app
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+
+        lifetime = max(current_app.config["JWT_ACCESS_TOKEN_EXPIRES"],
+                       current_app.config["JWT_REFRESH_TOKEN_EXPIRES"])
+        expires_at = _utcnow() + lifetime
+        db.session.add(RevokedToken(
+            jti=f"user:{user_id}:{token_version}",
+            token_type="user",
+            user_id=user_id,
+            token_version=token_version,
+            expires_at=expires_at,
+        ))
+        db.session.commit()
+        with self._lock:
+            self._raise_min_version(user_id, token_version, expires_at.replace(tzinfo=timezone.utc).timestamp())
+
+    def purge_expired(self):
+        """Delete rows for tokens that have expired; returns the number removed."""
+        from app.extensions import db
+        from app.models.revoked_token import RevokedToken
+
+        removed = RevokedToken.query.filter(RevokedToken.expires_at <= _utcnow())\
+            .delete(synchronize_session=False)
+        db.session.commit()
+        return removed
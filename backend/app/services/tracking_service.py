@@ -0,0 +1,140 @@
+from app.extensions import db
+from app.models.order import Order
+from datetime import datetime, timezone
+import csv
+import io
+import json
+
+
+class TrackingService:
+
+    BATCH_SIZE = 500
+    MAX_REPORTED_ROWS = 1000  # cap on unmatched/invalid rows echoed back
+
+    @staticmethod
+    def _text_stream(stream):
+        if isinstance(stream, io.TextIOBase):
+            return stream
+        return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+    @staticmethod
+    def _parse_csv(stream):
+        reader = csv.DictReader(TrackingService._text_stream(stream))
+        for line_no, row in enumerate(reader, start=2):
+            yield line_no, row
+
+    @staticmethod
+    def _parse_ndjson(stream):
+        for line_no, line in enumerate(TrackingService._text_stream(stream), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_no, None
+
+    @staticmethod
+    def _text(value):
+        """Field value as stripped text (None when empty); raises TypeError for non-scalar JSON."""
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise TypeError(f"expected text, got {type(value).__name__}")
+        return str(value).strip() or None
+
+    @staticmethod
+    def _normalize(row):
+        """Return (order_id, tracking_number, carrier_status) or None if the row is unusable."""
+        if not isinstance(row, dict):
+            return None
+        try:
+            order_id = int(row.get("order_id"))
+            tracking_number = TrackingService._text(row.get("tracking_number"))
+            carrier_status = TrackingService._text(row.get("carrier_status")) \
+                or TrackingService._text(row.get("status"))
+        except (ValueError, TypeError):
+            return None
+        if not tracking_number and not carrier_status:
+            return None
+        return order_id, tracking_number[:50] if tracking_number else None, \
+            carrier_status[:50] if carrier_status else None
+
+    @staticmethod
+    def _apply_batch(batch):
+        """Apply one batch with a single CASE-based UPDATE. Returns the set of matched ids."""
+        ids = list(batch)
+        matched = {row[0] for row in db.session.query(Order.id).filter(Order.id.in_(ids)).all()}
+        if not matched:
+            return matched
+
+        tracking = {oid: batch[oid][0] for oid in matched if batch[oid][0]}
+        carrier = {oid: batch[oid][1] for oid in matched if batch[oid][1]}
+        values = {"updated_at": datetime.now(timezone.utc)}
+        if tracking:
+            values["tracking_number"] = db.case(tracking, value=Order.id, else_=Order.tracking_number)
+        if carrier:
+            values["carrier_status"] = db.case(carrier, value=Order.id, else_=Order.carrier_status)
+
+        Order.query.filter(Order.id.in_(matched)).update(values, synchronize_session=False)
+        return matched
+
+    @staticmethod
+    def ingest(stream, fmt="csv", batch_size=None):
+        """Stream carrier updates from a CSV or NDJSON file and apply them in batches.
+
+        Each row carries ``order_id``, ``tracking_number`` and ``carrier_status``.
+        Later rows for the same order win field by field. Every batch is committed on its own so
+        a large file never holds one long transaction. If the file can't be read to the end, the
+        report of the batches already committed is returned together with the error.
+        """
+        if fmt not in ("csv", "ndjson"):
+            return None, "Format must be 'csv' or 'ndjson'"
+
+        batch_size = batch_size or TrackingService.BATCH_SIZE
+        rows = TrackingService._parse_csv(stream) if fmt == "csv" \
+            else TrackingService._parse_ndjson(stream)
+
+        report = {
+            "rows": 0,
+            "updated": 0,
+            "unmatched_count": 0,
+            "invalid_count": 0,
+            "unmatched": [],
+            "invalid": [],
+        }
+        batch = {}
+
+        def flush():
+            matched = TrackingService._apply_batch(batch)
+            db.session.commit()
+            report["updated"] += len(matched)
+            for oid in batch:
+                if oid not in matched and len(report["unmatched"]) < TrackingService.MAX_REPORTED_ROWS:
+                    report["unmatched"].append(oid)
+            report["unmatched_count"] += len(batch) - len(matched)
+            batch.clear()
+
+        try:
+            for line_no, row in rows:
+                report["rows"] += 1
+                parsed = TrackingService._normalize(row)
+                if parsed is None:
+                    report["invalid_count"] += 1
+                    if len(report["invalid"]) < TrackingService.MAX_REPORTED_ROWS:
+                        report["invalid"].append(line_no)
+                    continue
+                order_id, tracking_number, carrier_status = parsed
+                previous = batch.get(order_id, (None, None))
+                batch[order_id] = (tracking_number or previous[0], carrier_status or previous[1])
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Earlier batches are committed; only the pending one is lost
+            db.session.rollback()
+            report["unapplied_count"] = len(batch)
+            return report, f"Could not read file after {report['rows']} rows: {e}"
+
+        return report, None
@@ -0,0 +1,89 @@
+"""Per-user cache of wishlisted product ids.
+
+Membership checks read the cached id set; a miss costs one indexed query on
+``wishlist.user_id``. With ``memory://`` the sets live in the worker and are
+updated in place by wishlist writes in that worker; entries expire after
+``WISHLIST_CACHE_TTL`` seconds so writes made through other workers show up.
+With ``redis://`` the sets are shared and writes simply drop the user's entry.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class WishlistCache:
+
+    def __init__(self, app=None):
+        self.ttl = 60
+        self.max_users = 10000
+        self._redis = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("WISHLIST_CACHE_TTL", 60)
+        self.max_users = app.config.get("WISHLIST_CACHE_MAX_USERS", 10000)
+        url = app.config.get("WISHLIST_CACHE_URL", "memory://")
+        if url.startswith("redis"):
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("WISHLIST_CACHE_URL points at Redis but the 'redis' package is not installed") from e
+            self._redis = redis.Redis.from_url(url)
+        app.extensions["wishlist_cache"] = self
+
+    def _load(self, user_id):
+        from app.extensions import db
+        from app.models.wishlist import Wishlist
+
+        rows = db.session.query(Wishlist.product_id).filter(Wishlist.user_id == user_id).all()
+        return {row[0] for row in rows}
+
+    def get(self, user_id):
+        """Return the set of product ids in the user's wishlist."""
+        if self._redis is not None:
+            key = f"wishlist:{user_id}"
+            raw = self._redis.get(key)
+            if raw is not None:
+                return set(json.loads(raw))
+            ids = self._load(user_id)
+            self._redis.set(key, json.dumps(sorted(ids)), ex=self.ttl)
+            return ids
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and time.time() - entry[1] < self.ttl:
+                self._entries.move_to_end(user_id)
+                return set(entry[0])
+        ids = self._load(user_id)
+        with self._lock:
+            self._entries[user_id] = (ids, time.time())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return set(ids)
+
+    def _update(self, user_id, change):
+        if self._redis is not None:
+            self._redis.delete(f"wishlist:{user_id}")
+            return
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry:
+                change(entry[0])
+
+    def added(self, user_id, product_id):
+        self._update(user_id, lambda ids: ids.add(product_id))
+
+    def removed(self, user_id, product_id):
+        self._update(user_id, lambda ids: ids.discard(product_id))
+
+    def invalidate(self, user_id):
+        if self._redis is not None:
+            self._redis.delete(f"wishlist:{user_id}")
+            return
+        with self._lock:
+            self._entries.pop(user_id, None)
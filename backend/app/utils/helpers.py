@@ -1,19 +1,4 @@
-from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
-from app.models.user import User
-
-
-def admin_required(fn):
-    """Decorator to restrict access to admin users only."""
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        if not user or user.role != "ADMIN":
-            return jsonify({"error": "Admin access required"}), 403
-        return fn(*args, **kwargs)
-    return wrapper
+from app.utils.security import admin_required  # noqa: F401
 
 
 def validate_required_fields(data, fields):
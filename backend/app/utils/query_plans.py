@@ -0,0 +1,149 @@
+"""Query-plan regression checks for the hot read endpoints.
+
+``flask check-query-plans`` requests each endpoint in ``QUERY_PLAN_CASES``
+through the test client, records every SELECT it sends to the database and
+runs ``EXPLAIN`` on it (``EXPLAIN QUERY PLAN`` on SQLite). A statement fails
+when the plan reads a table without an index or sorts / groups in a
+temporary structure (MySQL "Using filesort", SQLite "USE TEMP B-TREE").
+
+Run it against a database with realistic row counts (e.g. after
+``seed_data.py``): on near-empty tables MySQL may prefer a full scan even
+when a matching index exists.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# (name, path, who) – ``who`` is None, "user" or "admin"; {product_id} and
+# {category_id} are filled in from the database
+QUERY_PLAN_CASES = [
+    ("products newest", "/api/products", None),
+    ("products price_low", "/api/products?sort=price_low", None),
+    ("products price_high", "/api/products?sort=price_high", None),
+    ("products name", "/api/products?sort=name", None),
+    ("products popular", "/api/products?sort=popular", None),
+    ("products discount", "/api/products?sort=discount&min_discount=10", None),
+    ("category products newest", "/api/products?category_id={category_id}", None),
+    ("category products price_low", "/api/products?category_id={category_id}&sort=price_low", None),
+    ("category products price_high", "/api/products?category_id={category_id}&sort=price_high", None),
+    ("category products name", "/api/products?category_id={category_id}&sort=name", None),
+    ("category products popular", "/api/products?category_id={category_id}&sort=popular", None),
+    ("category page", "/api/categories/{category_id}?sort=price_low", None),
+    ("featured", "/api/products/featured", None),
+    ("deals by discount", "/api/products/deals?sort=discount", None),
+    ("brands", "/api/products/brands", None),
+    ("product", "/api/products/{product_id}", None),
+    ("bought together", "/api/products/{product_id}/bought-together", None),
+    ("similar", "/api/products/{product_id}/similar", None),
+    ("reviews newest", "/api/reviews/product/{product_id}", None),
+    ("reviews highest", "/api/reviews/product/{product_id}?sort=highest", None),
+    ("reviews lowest", "/api/reviews/product/{product_id}?sort=lowest", None),
+    ("my orders", "/api/orders", "user"),
+    ("all orders", "/api/orders", "admin"),
+    ("wishlist", "/api/wishlist", "user"),
+]
+
+# Small lookup tables that are fine to read in full
+ALLOWED_FULL_SCANS = {"categories"}
+
+
+@contextmanager
+def captured_selects():
+    """Collect ``(statement, parameters)`` for every SELECT run inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        text = statement.lstrip().upper()
+        if not executemany and text.startswith("SELECT") and "INFORMATION_SCHEMA" not in text:
+            statements.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+def plan_problems(connection, statement, parameters):
+    """Return a list of problems in the plan of one statement (empty if fine)."""
+    problems = []
+    if connection.dialect.name == "sqlite":
+        for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters or ()):
+            detail = row[-1]
+            if detail.startswith("SCAN ") and " USING " not in detail:
+                table = detail.split()[1]
+                if table not in ALLOWED_FULL_SCANS:
+                    problems.append(f"full scan: {detail}")
+            elif detail.startswith("USE TEMP B-TREE"):
+                problems.append(f"sort: {detail}")
+    else:
+        result = connection.exec_driver_sql("EXPLAIN " + statement, parameters or ())
+        for row in result.mappings():
+            table = row.get("table")
+            extra = row.get("Extra") or ""
+            if row.get("type") == "ALL" and table not in ALLOWED_FULL_SCANS:
+                problems.append(f"full scan of {table}")
+            if "Using filesort" in extra or "Using temporary" in extra:
+                problems.append(f"{extra} on {table}")
+    return problems
+
+
+def _sample_ids(db):
+    from app.models.category import Category
+    from app.models.order import Order
+    from app.models.product import Product
+    from app.models.review import Review
+    from app.models.user import User
+
+    product_id = db.session.scalar(db.select(Review.product_id).limit(1)) \
+        or db.session.scalar(db.select(Product.id).where(Product.is_active == True).limit(1))
+    category_id = db.session.scalar(
+        db.select(Product.category_id).where(Product.category_id.isnot(None)).limit(1)
+    ) or db.session.scalar(db.select(Category.id).limit(1))
+    user_id = db.session.scalar(db.select(Order.user_id).limit(1)) \
+        or db.session.scalar(db.select(User.id).where(User.role != "ADMIN").limit(1))
+    admin_id = db.session.scalar(db.select(User.id).where(User.role == "ADMIN").limit(1))
+    return {"product_id": product_id, "category_id": category_id}, {"user": user_id, "admin": admin_id}
+
+
+def check_query_plans(app):
+    """Run every case; returns ``[(name, path, status_code, [(sql, problems)])]``."""
+    from flask_jwt_extended import create_access_token
+
+    from app.extensions import db
+    from app.models.user import User
+    from app.utils.security import token_claims
+
+    with app.app_context():
+        ids, users = _sample_ids(db)
+        headers = {}
+        for who, user_id in users.items():
+            if user_id is not None:
+                claims = token_claims(db.session.get(User, user_id))
+                token = create_access_token(identity=str(user_id), additional_claims=claims)
+                headers[who] = {"Authorization": f"Bearer {token}"}
+        db.session.remove()
+
+    client = app.test_client()
+    results = []
+    for name, path, who in QUERY_PLAN_CASES:
+        if who and who not in headers:
+            results.append((name, path, None, [("", [f"no {who} account to run as"])]))
+            continue
+        path = path.format(**ids)
+        with captured_selects() as statements:
+            response = client.get(path, headers=headers.get(who, {}))
+
+        failures, seen = [], set()
+        with app.app_context():
+            with db.engine.connect() as connection:
+                for statement, parameters in statements:
+                    if statement in seen:
+                        continue
+                    seen.add(statement)
+                    problems = plan_problems(connection, statement, parameters)
+                    if problems:
+                        failures.append((statement, problems))
+        results.append((name, path, response.status_code, failures))
+    return results
@@ -1,16 +1,72 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
+from flask import abort, jsonify, make_response
+from flask_jwt_extended import current_user
+from app.extensions import db
 from app.models.user import User
 
 
+class CurrentUser:
+    """The authenticated user for one request.
+
+    Role checks read the ``role`` claim and need no query; tokens issued
+    before a role change are already rejected by the blocklist
+    (``TokenBlocklist.revoke_user``). The user row is fetched on first
+    attribute access and kept for the rest of the request; a token whose
+    ``tv`` claim no longer matches ``User.token_version`` is rejected at that
+    point as well.
+    """
+
+    def __init__(self, user_id, claims):
+        self.id = int(user_id)
+        self.claims = claims
+        self._user = None
+
+    @property
+    def user(self):
+        if self._user is None:
+            user = db.session.get(User, self.id)
+            if user is None or self.claims.get("tv", 0) != (user.token_version or 0):
+                abort(make_response(jsonify({"error": "Token has been revoked"}), 401))
+            self._user = user
+        return self._user
+
+    @property
+    def role(self):
+        # Tokens issued before role claims existed fall back to the user row
+        return self.claims.get("role") or self.user.role
+
+    @property
+    def is_admin(self):
+        return self.role == "ADMIN"
+
+    def __getattr__(self, name):
+        return getattr(self.user, name)
+
+
+def init_jwt(jwt):
+    """Register the JWT callbacks that build ``current_user``."""
+
+    @jwt.user_lookup_loader
+    def load_current_user(jwt_header, jwt_data):
+        # Called once per request by flask_jwt_extended; the row itself loads lazily
+        return CurrentUser(jwt_data["sub"], jwt_data)
+
+
+def token_claims(user):
+    """Extra JWT claims embedded at login so role checks need no query."""
+    return {"role": user.role, "tv": user.token_version or 0}
+
+
+def is_admin():
+    """Whether the current request's token carries the ADMIN role."""
+    return current_user.is_admin
+
+
 def admin_required(fn):
     """Decorator to restrict access to admin users only."""
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        if not user or user.role != "ADMIN":
+        if not current_user.is_admin:
             return jsonify({"error": "Admin access required"}), 403
         return fn(*args, **kwargs)
     return wrapper
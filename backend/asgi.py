@@ -0,0 +1,9 @@
+"""ASGI entry point: async catalog reads, everything else via the Flask app.
+
+    uvicorn asgi:app --workers 4
+"""
+import os
+
+from app.async_catalog import create_async_app
+
+app = create_async_app(os.environ.get("APP_ENV", "production"))
@@ -0,0 +1,115 @@
+"""
+Login throughput benchmark.
+
+Fires concurrent POST /api/auth/login requests at the app (in-process, against
+a throwaway SQLite database) and reports throughput, latency percentiles and
+how many requests were shed with 503. A catalog request is timed alongside
+the burst to show how much hashing slows unrelated traffic.
+
+Usage:
+    python benchmarks/login_throughput.py --rounds 12 --concurrency 32 --requests 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import create_app  # noqa: E402
+from app.extensions import db, password_hasher  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def build_app(args, db_path):
+    class BenchConfig:
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+        SECRET_KEY = "bench"
+        JWT_SECRET_KEY = "bench-jwt-secret-key-with-enough-length"
+        JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+        JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=1)
+        BCRYPT_LOG_ROUNDS = args.rounds
+        BCRYPT_POOL_SIZE = args.pool_size
+        BCRYPT_QUEUE_DEPTH = args.queue_depth
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(name="Bench", email="bench@example.com",
+                            password_hash=password_hasher.hash("benchpass")))
+        db.session.commit()
+    return app
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=None)
+    parser.add_argument("--queue-depth", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(args, os.path.join(tmp, "bench.db"))
+        latencies, statuses = [], {}
+        lock = threading.Lock()
+
+        def login(_):
+            client = app.test_client()
+            start = time.perf_counter()
+            r = client.post("/api/auth/login", json={"email": "bench@example.com", "password": "benchpass"})
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+                if r.status_code == 200:
+                    latencies.append(elapsed)
+
+        catalog = []
+        done = threading.Event()
+
+        def probe():
+            client = app.test_client()
+            while not done.is_set():
+                start = time.perf_counter()
+                client.get("/api/products?per_page=1")
+                catalog.append(time.perf_counter() - start)
+                time.sleep(0.01)
+
+        prober = threading.Thread(target=probe)
+        prober.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(login, range(args.requests)))
+        wall = time.perf_counter() - start
+        done.set()
+        prober.join()
+
+    ok = statuses.get(200, 0)
+    print(f"rounds={args.rounds} concurrency={args.concurrency} requests={args.requests} "
+          f"pool={password_hasher.pool_size} queue_depth={args.queue_depth}")
+    print(f"  status counts     : {dict(sorted(statuses.items()))}")
+    print(f"  login throughput  : {ok / wall:.1f} logins/s over {wall:.2f}s")
+    if latencies:
+        print(f"  login latency     : p50={percentile(latencies, 50) * 1000:.0f}ms "
+              f"p95={percentile(latencies, 95) * 1000:.0f}ms")
+    if catalog:
+        print(f"  catalog latency   : median={statistics.median(catalog) * 1000:.1f}ms "
+              f"p95={percentile(catalog, 95) * 1000:.1f}ms during the burst")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Serving-mode throughput comparison.
+
+Starts gunicorn with ``gunicorn.conf.py`` once per worker class and drives the
+same mix of catalog requests at each (product list, product detail, featured
+products, categories), reporting throughput, latency percentiles and errors.
+
+By default the app runs on a throwaway SQLite database, where every query is
+local and fast, so async workers show little gain. Pass ``--database-url`` for
+a MySQL instance across the network to see how gevent workers behave
+when requests spend most of their time waiting on the database; the tables
+must already exist there (``flask init-db`` and ``python seed_data.py``).
+The app runs with the production profile, which refuses the in-process cart
+store, so pass ``--cart-store-url`` (or set ``CART_STORE_URL``) to a Redis URL.
+
+Usage:
+    python benchmarks/serving_modes.py --modes sync gthread gevent --workers 4 --concurrency 64
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+
+def seed_sqlite(db_path, products):
+    from app import create_app
+    from app.extensions import db
+    from app.models.category import Category
+    from app.models.product import Product
+
+    class SeedConfig:
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        categories = [Category(name=f"Category {i}", slug=f"category-{i}") for i in range(6)]
+        db.session.add_all(categories)
+        db.session.flush()
+        for i in range(products):
+            db.session.add(Product(
+                name=f"Product {i}", description="Benchmark product " * 20,
+                price=round(random.uniform(5, 500), 2), stock=100, brand=f"Brand {i % 12}",
+                category_id=categories[i % len(categories)].id, is_featured=i % 10 == 0,
+                images=json.dumps([f"https://example.com/{i}/{n}.jpg" for n in range(4)]),
+            ))
+        db.session.commit()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, args, database_url, port):
+    env = dict(
+        os.environ,
+        APP_ENV="production",
+        DATABASE_URL=database_url,
+        GUNICORN_WORKER_CLASS=mode,
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        WEB_CONCURRENCY=str(args.workers),
+        CART_STORE_URL=args.cart_store_url,
+        GUNICORN_ACCESS_LOG="",
+        GUNICORN_LOG_LEVEL="warning",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1)
+            return proc
+        except (urllib.error.URLError, ConnectionError):
+            if proc.poll() is not None:
+                sys.exit(f"gunicorn exited while starting in '{mode}' mode")
+            time.sleep(0.2)
+    proc.terminate()
+    sys.exit(f"gunicorn did not become healthy in '{mode}' mode")
+
+
+def drive(port, args, product_ids):
+    paths = [
+        lambda: "/api/products?per_page=24&page=%d" % random.randint(1, 5),
+        lambda: "/api/products/%d" % random.choice(product_ids),
+        lambda: "/api/products/featured",
+        lambda: "/api/categories",
+    ]
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    stop_at = time.time() + args.duration
+
+    def client():
+        nonlocal errors
+        while time.time() < stop_at:
+            url = f"http://127.0.0.1:{port}{random.choice(paths)()}"
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, ConnectionError):
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(client)
+    wall = time.perf_counter() - started
+    return latencies, errors, wall
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["sync", "gthread", "gevent"],
+                        choices=["sync", "gthread", "gevent"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per mode")
+    parser.add_argument("--products", type=int, default=500, help="products to seed (SQLite only)")
+    parser.add_argument("--database-url", help="use an existing, seeded database instead of SQLite")
+    parser.add_argument("--cart-store-url", default=os.environ.get("CART_STORE_URL", "memory://"),
+                        help="Redis URL for the cart store (the production profile refuses memory://)")
+    args = parser.parse_args()
+    if args.cart_store_url.startswith("memory"):
+        parser.error("--cart-store-url must point at Redis")
+
+    tmp = None
+    database_url = args.database_url
+    if not database_url:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, "bench.db")
+        seed_sqlite(db_path, args.products)
+        database_url = f"sqlite:///{db_path}"
+    product_ids = list(range(1, args.products + 1))
+
+    results = []
+    for mode in args.modes:
+        port = free_port()
+        proc = start_server(mode, args, database_url, port)
+        try:
+            latencies, errors, wall = drive(port, args, product_ids)
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=60)
+        results.append((mode, len(latencies) / wall, latencies, errors))
+
+    print(f"\n{args.workers} worker(s), {args.concurrency} concurrent clients, {args.duration:.0f}s per mode")
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode, rps, latencies, errors in results:
+        print(f"{mode:<10}{rps:>10.1f}"
+              f"{(statistics.median(latencies) if latencies else 0) * 1000:>10.1f}"
+              f"{percentile(latencies, 95) * 1000:>10.1f}"
+              f"{percentile(latencies, 99) * 1000:>10.1f}{errors:>8}")
+
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
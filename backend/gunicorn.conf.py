@@ -0,0 +1,90 @@
+"""
+Gunicorn configuration for production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Everything can be overridden with environment variables:
+
+GUNICORN_BIND           address to listen on (default 0.0.0.0:5000)
+WEB_CONCURRENCY         worker processes (default 2 x cores + 1)
+GUNICORN_WORKER_CLASS   sync (default), gthread or gevent
+GUNICORN_THREADS        threads per gthread worker (default 4)
+GUNICORN_CONNECTIONS    concurrent requests per gevent worker (default 100)
+GUNICORN_TIMEOUT        seconds a request may run before its worker is killed (default 30)
+GUNICORN_PRELOAD        import the app once in the master before forking (default true)
+
+Async workers: with ``gevent`` the standard library is monkey-patched below,
+before the app (and PyMySQL, which is pure Python) is imported, so MySQL and
+Redis round-trips yield to other requests instead of blocking the worker.
+Size ``DB_POOL_SIZE`` to roughly the number of requests expected to hold a
+connection at once, not to GUNICORN_CONNECTIONS. bcrypt runs on gevent's
+native thread pool (see ``app/services/password_hasher.py``), so logins do
+not block the event loop. ``eventlet`` is refused: the hashing pool has no
+eventlet-native variant, and a bcrypt call would stall every request in the
+worker.
+
+Per-process state: with more than one worker, ``CART_STORE_URL=memory://``
+is refused (each worker would flush its own stale copy of a cart over the
+others'), and ``WISHLIST_CACHE_URL=memory://`` is logged as a warning, since
+workers then serve wishlists up to ``WISHLIST_CACHE_TTL`` seconds stale.
+The worker count is exported as WEB_CONCURRENCY so the app sees it too.
+
+Reloads: ``kill -HUP <master>`` restarts workers gracefully, but with preload
+on they fork from the code the master already imported. To deploy new code
+without dropping requests, start a new master with ``kill -USR2 <master>``,
+then stop the old one with ``kill -TERM <old master>`` once the new workers
+are up. ``max_requests`` also recycles workers periodically to cap memory
+growth.
+"""
+import multiprocessing
+import os
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+
+if worker_class == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+elif worker_class == "eventlet":
+    raise RuntimeError("GUNICORN_WORKER_CLASS=eventlet is not supported: bcrypt would block its event loop; use gevent")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4)) if worker_class == "gthread" else 1
+worker_connections = int(os.environ.get("GUNICORN_CONNECTIONS", 100))
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+if workers > 1 and os.environ.get("CART_STORE_URL", "memory://").startswith("memory"):
+    raise RuntimeError(
+        f"CART_STORE_URL=memory:// keeps a separate cart per worker process and loses cart edits "
+        f"with {workers} workers; point it at Redis or set WEB_CONCURRENCY=1"
+    )
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-") or None   # empty disables
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    if workers > 1 and os.environ.get("WISHLIST_CACHE_URL", "memory://").startswith("memory"):
+        server.log.warning(
+            "WISHLIST_CACHE_URL=memory:// with %d workers: each worker caches wishlists separately and may "
+            "serve them up to WISHLIST_CACHE_TTL seconds stale; point it at Redis to share them", workers
+        )
+
+
+def post_fork(server, worker):
+    # Connections must never be shared across processes; create_app opens
+    # none, but drop anything the master may have opened after preloading
+    from app.extensions import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,43 @@
+"""order status history
+
+Revision ID: 3f1c2a9d8e01
+Revises: bc54b7b26c5d
+Create Date: 2026-10-20 09:12:04.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d8e01'
+down_revision = 'bc54b7b26c5d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built from an earlier copy of the baseline already have it
+    if sa.inspect(op.get_bind()).has_table('order_status_history'):
+        return
+    op.create_table('order_status_history',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('from_status', sa.String(length=20), nullable=True),
+    sa.Column('to_status', sa.String(length=20), nullable=False),
+    sa.Column('changed_by', sa.Integer(), nullable=True),
+    sa.Column('note', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['changed_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_status_history', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_status_history_order_id'), ['order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_status_history', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_status_history_order_id'))
+
+    op.drop_table('order_status_history')
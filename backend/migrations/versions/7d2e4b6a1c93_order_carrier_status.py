@@ -0,0 +1,30 @@
+"""order carrier status
+
+Revision ID: 7d2e4b6a1c93
+Revises: 3f1c2a9d8e01
+Create Date: 2026-10-20 09:12:31.540917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2e4b6a1c93'
+down_revision = '3f1c2a9d8e01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built from an earlier copy of the baseline already have it
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('orders')}
+    if 'carrier_status' in columns:
+        return
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('carrier_status', sa.String(length=50), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('carrier_status')
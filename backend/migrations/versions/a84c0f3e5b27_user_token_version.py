@@ -0,0 +1,30 @@
+"""user token version
+
+Revision ID: a84c0f3e5b27
+Revises: 7d2e4b6a1c93
+Create Date: 2026-10-20 09:12:58.007361
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a84c0f3e5b27'
+down_revision = '7d2e4b6a1c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built from an earlier copy of the baseline already have it
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('users')}
+    if 'token_version' in columns:
+        return
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
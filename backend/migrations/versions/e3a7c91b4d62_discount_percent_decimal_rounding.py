@@ -0,0 +1,48 @@
+"""round discount_percent as a decimal
+
+Revision ID: e3a7c91b4d62
+Revises: 074746065932
+Create Date: 2026-10-19 20:10:00.000000
+
+ROUND over a double rounds half to even on MySQL (depending on the C
+library) but half away from zero on SQLite. Casting to DECIMAL first makes
+the generated value the same everywhere, and the same as the Python fallback
+on Product.discount_percent. Generated expressions can't be altered in
+place on every backend, so both generated columns and the index are rebuilt
+(SQLite's batch copy can't carry a generated column across, so
+discount_amount is dropped and re-added alongside).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7c91b4d62'
+down_revision = '074746065932'
+branch_labels = None
+depends_on = None
+
+AMOUNT_EXPRESSION = 'CASE WHEN compare_price > price THEN compare_price - price ELSE 0 END'
+OLD_EXPRESSION = 'CASE WHEN compare_price > price THEN ROUND((1 - price / compare_price) * 100) ELSE 0 END'
+NEW_EXPRESSION = ('CASE WHEN compare_price > price '
+                  'THEN ROUND(CAST((1 - price / compare_price) * 100 AS DECIMAL(10, 4))) ELSE 0 END')
+
+
+def _rebuild(expression):
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_active_discount')
+        batch_op.drop_column('discount_percent')
+        batch_op.drop_column('discount_amount')
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('discount_amount', sa.Float(), sa.Computed(AMOUNT_EXPRESSION, persisted=True), nullable=True))
+        batch_op.add_column(sa.Column('discount_percent', sa.Integer(), sa.Computed(expression, persisted=True), nullable=True))
+        batch_op.create_index('ix_products_active_discount', ['is_active', 'discount_percent'], unique=False)
+
+
+def upgrade():
+    _rebuild(NEW_EXPRESSION)
+
+
+def downgrade():
+    _rebuild(OLD_EXPRESSION)
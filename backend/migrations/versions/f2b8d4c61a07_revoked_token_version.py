@@ -0,0 +1,26 @@
+"""revoked token version
+
+Revision ID: f2b8d4c61a07
+Revises: e3a7c91b4d62
+Create Date: 2026-10-21 10:02:41.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d4c61a07'
+down_revision = 'e3a7c91b4d62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
@@ -1,6 +1,7 @@
+"""Development server. For production use ``gunicorn -c gunicorn.conf.py wsgi:app``."""
 from app import create_app
 
 app = create_app()
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    app.run(debug=app.config["DEBUG"], host="0.0.0.0", port=5000)
@@ -2,7 +2,8 @@
 import sys, os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from app import create_app
+from app import create_app, init_migrations
+from app.commands import upgrade_schema
 from app.extensions import db, bcrypt
 from app.models.user import User
 from app.models.product import Product
@@ -14,10 +15,13 @@ from datetime import datetime, timezone, timedelta
 import json, random
 
 app = create_app()
+init_migrations(app)
 
 with app.app_context():
-    db.drop_all()
-    db.create_all()
+    db.drop_all(bind_key=None)
+    db.session.execute(db.text("DROP TABLE IF EXISTS alembic_version"))
+    db.session.commit()
+    upgrade_schema()
 
     # ── CATEGORIES ──
     categories_data = [
@@ -150,7 +150,7 @@ export default function Cart() {
         <div className="cart-layout">
           <div className="cart-items">
             {cart.map((item) => (
-              <div key={item.id} className="cart-item">
+              <div key={item.product_id} className="cart-item">
                 <Link to={`/product/${item.product_id}`} className="cart-item-image">
                   {item.product?.image_url ? (
                     <img src={item.product.image_url} alt={item.product.name} />